@@ -0,0 +1,101 @@
+import argparse
+import importlib
+
+from aoc.registry import find_jobs, find_unregistered_functions
+from aoc.runner import DEFAULT_TIMINGS_FILE, load_timings, run_jobs, run_jobs_parallel, save_timings, write_report
+from util.cache_util import configure_parse_cache
+from util.file_util import set_input_file, set_input_folder
+from util.run_util import PROFILER, RunTimer, instrument
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="aoc", description="Run Advent of Code 2023 solutions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command, description in [("run", "run solutions in this process"),
+                                 ("batch", "run solutions in parallel worker processes"),
+                                 ("list", "list available solutions")]:
+        subparser = subparsers.add_parser(command, help=description)
+        subparser.add_argument("levels", nargs="*", type=int, help="levels to run, all if empty")
+        subparser.add_argument("--part", type=int, action="append", help="only run the given part(s)")
+        subparser.add_argument("--variant", action="append", help="only run the given variant(s), e.g. bfs")
+        subparser.add_argument("--input", help="input file to use, requires exactly one level")
+        subparser.add_argument("--folder", help="input folder below input-files, e.g. test")
+        subparser.add_argument("--report", help="write answers and timings to a .json or .csv file")
+        subparser.add_argument("--parse-cache", help="folder to keep parsed inputs in between runs")
+        if command == "run":
+            subparser.add_argument("--profile", help="write a flame graph compatible collapsed stack file")
+            subparser.add_argument("--instrument", action="append", default=["parse_input_file"],
+                                   help="module attribute to time as its own span, e.g. City.a_star")
+            subparser.add_argument("--memory", action="store_true", help="record peak memory per span")
+        if command == "batch":
+            subparser.add_argument("--jobs", type=int, help="number of worker processes, defaults to the cpu count")
+            subparser.add_argument("--timings", default=DEFAULT_TIMINGS_FILE,
+                                   help="recorded timings used for scheduling, updated after the run")
+    return parser
+
+
+def instrument_jobs(jobs: list, names: list[str]):
+    instrumented = set()
+    for job in jobs:
+        module_name = job.get_module_name()
+        if module_name in instrumented:
+            continue
+        instrumented.add(module_name)
+        module = importlib.import_module(module_name)
+        for name in names:
+            try:
+                instrument(module, name)
+            except (AttributeError, KeyError):
+                pass
+
+
+def main(argv: list[str] | None = None):
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    if args.input is not None:
+        if len(args.levels) != 1:
+            parser.error("--input requires exactly one level")
+        set_input_file(args.levels[0], args.input)
+    if args.folder is not None:
+        set_input_folder(args.folder)
+    if args.parse_cache is not None:
+        configure_parse_cache(directory=args.parse_cache)
+
+    jobs = find_jobs(args.levels, args.part, args.variant)
+    if not jobs:
+        parser.error("no matching solutions found")
+
+    if args.command == "list":
+        for job in jobs:
+            print(f"{job}: {job.get_module_name()}.{job.function_name}{job.args}")
+        unregistered = find_unregistered_functions(args.levels, args.variant)
+        if unregistered:
+            print("Found without a job definition, not run: " + ", ".join(unregistered))
+        return
+
+    timer = RunTimer()
+    if args.command == "batch":
+        timings = load_timings(args.timings)
+        input_files = {args.levels[0]: args.input} if args.input is not None else {}
+        results = run_jobs_parallel(jobs, timings, args.jobs, args.folder, input_files, args.parse_cache)
+        save_timings(args.timings, timings, results)
+    else:
+        if args.profile is not None:
+            instrument_jobs(jobs, args.instrument)
+            if args.memory:
+                PROFILER.start_memory_tracing()
+        results = run_jobs(jobs)
+    timer.print()
+
+    if args.command == "run" and args.profile is not None:
+        PROFILER.print()
+        PROFILER.write_collapsed_stacks(args.profile)
+
+    if args.report is not None:
+        write_report(args.report, results, timer.get_time())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import importlib
+import inspect
+import os
+import re
+from collections.abc import Callable
+
+SOLUTIONS_PACKAGE = "solutions"
+SOLUTIONS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), SOLUTIONS_PACKAGE)
+
+MODULE_PATTERN = re.compile(r"^level(\d+)(?:_([a-z]+))?\.py$")
+FUNCTION_PATTERN = re.compile(r"^level\d+(_\w+)?$")
+
+# maintained by hand after the calls in each module's __main__ block: function name -> [(answered parts, args)],
+# discovered functions without an entry aren't run, find_unregistered_functions lists them
+JOB_DEFINITIONS: dict[str, list[tuple[tuple[int, ...], tuple]]] = {
+    "level1": [((1,), (False,)), ((2,), (True,))],
+    "level2": [((1, 2), ())],
+    "level3": [((1, 2), ())],
+    "level4": [((1, 2), ())],
+    "level5": [((1, 2), ())],
+    "level7": [((1,), (False,)), ((2,), (True,))],
+    "level8_1": [((1,), ())],
+    "level8_2": [((2,), ())],
+    "level9": [((1, 2), ())],
+    "level10": [((1, 2), ())],
+    "level11": [((1,), (2,)), ((2,), (1000000,))],
+    "level12_naive": [((1,), (False,)), ((2,), (True,))],
+    "level12_dfs": [((1,), (False,)), ((2,), (True,))],
+    "level12_bfs": [((1,), (False,)), ((2,), (True,))],
+    "level12_dp": [((1,), (False,)), ((2,), (True,))],
+    "level12_batch": [((1,), (False,)), ((2,), (True,))],
+    "level13": [((1,), (False,)), ((2,), (True,))],
+    "level14_1": [((1,), ())],
+    "level14_2": [((2,), ())],
+    "level15": [((1, 2), ())],
+    "level16": [((1, 2), ())],
+    "level17": [((1,), (range(1, 4),)), ((2,), (range(4, 11),))],
+    "level18": [((1,), (False,)), ((2,), (True,))],
+    "level19": [((1, 2), ())],
+    "level20": [((1, 2), ())],
+    "level21_finite": [((1,), (64,))],
+    "level21_infinite": [((2,), (26501365,))],
+    "level22": [((1, 2), ())],
+    "level23": [((1, 2), ())],
+    "level24_1": [((1,), (200000000000000, 400000000000000))],
+    "level24_2": [((2,), ())],
+    "level25": [((1,), ())],
+}
+
+
+class Job:
+    level_id: int
+    variant: str
+    parts: tuple[int, ...]
+    function_name: str
+    args: tuple
+
+    def __init__(self, level_id: int, variant: str, parts: tuple[int, ...], function_name: str, args: tuple):
+        self.level_id = level_id
+        self.variant = variant
+        self.parts = parts
+        self.function_name = function_name
+        self.args = args
+
+    def __str__(self):
+        variant = f" ({self.variant})" if self.variant else ""
+        parts = ", ".join(map(str, self.parts))
+        return f"Level {self.level_id}{variant} part {parts}"
+
+    def get_key(self) -> str:
+        parts = ",".join(map(str, self.parts))
+        return f"{self.get_module_name()}.{self.function_name}:{parts}"
+
+    def get_module_name(self) -> str:
+        variant = f"_{self.variant}" if self.variant else ""
+        return f"{SOLUTIONS_PACKAGE}.level{self.level_id}{variant}"
+
+    def get_function(self) -> Callable:
+        module = importlib.import_module(self.get_module_name())
+        return getattr(module, self.function_name)
+
+    def run(self) -> tuple:
+        result = self.get_function()(*self.args)
+        if len(self.parts) == 1:
+            return result,
+        return tuple(result)
+
+
+def discover_modules() -> list[tuple[int, str]]:
+    modules = []
+    for file_name in os.listdir(SOLUTIONS_FOLDER):
+        match = MODULE_PATTERN.match(file_name)
+        if match:
+            modules.append((int(match.group(1)), match.group(2) or ""))
+    return sorted(modules)
+
+
+def discover_functions(level_id: int, variant: str) -> list[str]:
+    module_name = f"{SOLUTIONS_PACKAGE}.level{level_id}" + (f"_{variant}" if variant else "")
+    module = importlib.import_module(module_name)
+    return [name for name, function in inspect.getmembers(module, inspect.isfunction)
+            if function.__module__ == module.__name__ and FUNCTION_PATTERN.match(name)]
+
+
+def discover_selected_functions(level_ids: list[int] | None = None,
+                                variants: list[str] | None = None) -> list[tuple[int, str, str]]:
+    functions = []
+    for level_id, variant in discover_modules():
+        if level_ids and level_id not in level_ids:
+            continue
+        if variants and variant and variant not in variants:
+            continue
+        functions.extend((level_id, variant, function_name) for function_name in discover_functions(level_id, variant))
+    return functions
+
+
+def find_unregistered_functions(level_ids: list[int] | None = None, variants: list[str] | None = None) -> list[str]:
+    return [f"{SOLUTIONS_PACKAGE}.level{level_id}{f'_{variant}' if variant else ''}.{function_name}"
+            for level_id, variant, function_name in discover_selected_functions(level_ids, variants)
+            if function_name not in JOB_DEFINITIONS]
+
+
+def find_jobs(level_ids: list[int] | None = None, parts: list[int] | None = None,
+              variants: list[str] | None = None) -> list[Job]:
+    jobs = []
+    for level_id, variant, function_name in discover_selected_functions(level_ids, variants):
+        for job_parts, args in JOB_DEFINITIONS.get(function_name, []):
+            if parts and not set(parts).intersection(job_parts):
+                continue
+            jobs.append(Job(level_id, variant, job_parts, function_name, args))
+    jobs.sort(key=lambda job: (job.level_id, job.variant, job.parts))
+    return jobs
@@ -0,0 +1,120 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from aoc.registry import Job
+from util.cache_util import configure_parse_cache
+from util.file_util import set_input_file, set_input_folder
+from util.run_util import PROFILER, RunTimer
+
+DEFAULT_TIMINGS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "aoc-timings.json")
+
+
+class JobResult:
+    job: Job
+    answers: tuple
+    runtime: float
+    error: str | None
+
+    def __init__(self, job: Job, answers: tuple, runtime: float, error: str | None = None):
+        self.job = job
+        self.answers = answers
+        self.runtime = runtime
+        self.error = error
+
+    def __str__(self):
+        if self.error is not None:
+            return f"{self.job}: failed with {self.error} ({self.runtime:.3f}s)"
+        answers = ", ".join(map(str, self.answers))
+        return f"{self.job}: {answers} ({self.runtime:.3f}s)"
+
+    def to_dict(self) -> dict:
+        return {
+            "level": self.job.level_id,
+            "variant": self.job.variant,
+            "parts": ",".join(map(str, self.job.parts)),
+            "function": self.job.function_name,
+            "answers": ",".join(map(str, self.answers)),
+            "runtime": self.runtime,
+            "error": self.error or "",
+        }
+
+
+def run_job(job: Job) -> JobResult:
+    timer = RunTimer()
+    try:
+        with PROFILER.span(str(job)):
+            answers = job.run()
+    except Exception as exception:
+        return JobResult(job, (), timer.get_time(), f"{type(exception).__name__}: {exception}")
+    return JobResult(job, answers, timer.get_time())
+
+
+def run_jobs(jobs: list[Job], verbose: bool = True) -> list[JobResult]:
+    results = []
+    for job in jobs:
+        result = run_job(job)
+        if verbose:
+            print(result)
+        results.append(result)
+    return results
+
+
+def get_num_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _init_worker(input_folder: str | None, input_files: dict[int, str], parse_cache: str | None):
+    set_input_folder(input_folder)
+    configure_parse_cache(directory=parse_cache)
+    for level_id, path in input_files.items():
+        set_input_file(level_id, path)
+
+
+def run_jobs_parallel(jobs: list[Job], timings: dict[str, float], num_workers: int | None = None,
+                      input_folder: str | None = None, input_files: dict[int, str] | None = None,
+                      parse_cache: str | None = None, verbose: bool = True) -> list[JobResult]:
+    # longest expected job first, jobs without a recorded timing count as longest
+    schedule = sorted(jobs, key=lambda job: -timings.get(job.get_key(), float("inf")))
+    num_workers = min(num_workers or get_num_cpus(), len(jobs))
+
+    with ProcessPoolExecutor(num_workers, initializer=_init_worker,
+                             initargs=(input_folder, input_files or {}, parse_cache)) as executor:
+        futures = {job.get_key(): executor.submit(run_job, job) for job in schedule}
+        results = []
+        for job in jobs:
+            result = futures[job.get_key()].result()
+            if verbose:
+                print(result)
+            results.append(result)
+    return results
+
+
+def load_timings(path: str) -> dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as timings_file:
+        return json.load(timings_file)
+
+
+def save_timings(path: str, timings: dict[str, float], results: list[JobResult]):
+    for result in results:
+        if result.error is None:
+            timings[result.job.get_key()] = result.runtime
+    with open(path, "w") as timings_file:
+        json.dump(timings, timings_file, indent=2, sort_keys=True)
+
+
+def write_report(path: str, results: list[JobResult], total_runtime: float):
+    rows = [result.to_dict() for result in results]
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as report_file:
+            writer = csv.DictWriter(report_file, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w") as report_file:
+            json.dump({"total_runtime": total_runtime, "results": rows}, report_file, indent=2)
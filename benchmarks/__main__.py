@@ -0,0 +1,29 @@
+import argparse
+import sys
+
+from benchmarks.runner import BENCHMARKS, run_benchmarks
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Time solutions on generated inputs")
+    parser.add_argument("levels", nargs="*", type=int, help=f"levels to benchmark, any of {sorted(BENCHMARKS)}")
+    parser.add_argument("--sizes", nargs="+", type=int, help="sizes to generate instead of the level defaults")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size, the fastest one counts")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="store the measured runtimes as baseline")
+    args = parser.parse_args(argv)
+
+    unknown_levels = set(args.levels).difference(BENCHMARKS)
+    if unknown_levels:
+        parser.error(f"no benchmark for levels {sorted(unknown_levels)}")
+
+    regressions = run_benchmarks(args.levels or sorted(BENCHMARKS), args.sizes, args.repeat,
+                                 args.tolerance, args.save_baseline)
+    if regressions:
+        print("Regressions:")
+        print("\n".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
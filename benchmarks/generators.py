@@ -0,0 +1,293 @@
+import random
+import string
+
+PIPE_CHARS = "|-LJ7F."
+MIRROR_CHARS = "/\\|-"
+SYMBOL_CHARS = "*#+$/@%=&-"
+# junctions per side of the level23 lattice, the longest hike search is exponential in them
+MAX_LEVEL23_JUNCTIONS = 7
+LEVEL23_WALLED_SHARE = 0.15
+
+
+def get_name(i: int, length: int = 2) -> str:
+    name = ""
+    for _ in range(length):
+        i, letter = divmod(i, 26)
+        name = string.ascii_lowercase[letter] + name
+    return name
+
+
+def generate_level3(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        line = ""
+        while len(line) < size:
+            roll = rng.random()
+            if roll < 0.1:
+                line += str(rng.randint(1, 999))
+            elif roll < 0.15:
+                line += rng.choice(SYMBOL_CHARS)
+            else:
+                line += "."
+            if line[-1].isdigit():
+                line += "."
+        lines.append(line[:size])
+    return lines
+
+
+def generate_level10(size: int, seed: int = 0) -> list[str]:
+    # a comb shaped loop starting at the top left, every other tile is random pipe junk
+    rng = random.Random(seed)
+    size = max(size, 7)
+    field = [[rng.choice(PIPE_CHARS) for _ in range(size)] for _ in range(size)]
+
+    vertices = [(1, 1), (1, size - 2)]
+    x, at_bottom = 1, True
+    num_teeth = (size - 3) // 2
+    # an odd number of teeth makes the last one end at the top
+    num_teeth -= 1 - num_teeth % 2
+    for _ in range(num_teeth):
+        x += 2
+        vertices.append((x, vertices[-1][1]))
+        vertices.append((x, 2 if at_bottom else size - 2))
+        at_bottom = not at_bottom
+    vertices.append((x, 1))
+    vertices.append((1, 1))
+
+    loop = [(1, 1)]
+    for (start_x, start_y), (end_x, end_y) in zip(vertices, vertices[1:]):
+        delta_x = (end_x > start_x) - (end_x < start_x)
+        delta_y = (end_y > start_y) - (end_y < start_y)
+        while loop[-1] != (end_x, end_y):
+            loop.append((loop[-1][0] + delta_x, loop[-1][1] + delta_y))
+
+    pipes = {
+        frozenset({(0, -1), (0, 1)}): "|",
+        frozenset({(-1, 0), (1, 0)}): "-",
+        frozenset({(0, -1), (1, 0)}): "L",
+        frozenset({(0, -1), (-1, 0)}): "J",
+        frozenset({(0, 1), (-1, 0)}): "7",
+        frozenset({(0, 1), (1, 0)}): "F",
+    }
+    for i in range(1, len(loop) - 1):
+        (previous_x, previous_y), (x, y), (next_x, next_y) = loop[i - 1], loop[i], loop[i + 1]
+        field[y][x] = pipes[frozenset({(previous_x - x, previous_y - y), (next_x - x, next_y - y)})]
+    field[1][1] = "S"
+    return list(map("".join, field))
+
+
+def generate_level11(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    empty_rows = set(rng.sample(range(size), size // 10))
+    empty_cols = set(rng.sample(range(size), size // 10))
+    return ["".join("#" if y not in empty_rows and x not in empty_cols and rng.random() < 0.03 else "."
+                    for x in range(size)) for y in range(size)]
+
+
+def generate_level12(size: int, seed: int = 0) -> list[str]:
+    # the groups are taken from a random arrangement, then some springs are hidden again
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        springs = "".join(rng.choice("#..") for _ in range(rng.randint(6, 20)))
+        groups = [len(group) for group in springs.split(".") if group]
+        if not groups:
+            springs, groups = "#" + springs[1:], [1]
+        row = "".join("?" if rng.random() < 0.5 else spring for spring in springs)
+        lines.append(f"{row} {','.join(map(str, groups))}")
+    return lines
+
+
+def generate_level13(size: int, seed: int = 0) -> list[str]:
+    # size patterns, each mirrored at a random row and with one smudge
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        width, half_height = rng.randint(5, 17), rng.randint(2, 8)
+        half = ["".join(rng.choice("#.") for _ in range(width)) for _ in range(half_height)]
+        pattern = half + half[::-1][:rng.randint(1, half_height)]
+        smudge_y, smudge_x = rng.randrange(len(pattern)), rng.randrange(width)
+        row = pattern[smudge_y]
+        pattern[smudge_y] = row[:smudge_x] + ("." if row[smudge_x] == "#" else "#") + row[smudge_x + 1:]
+        lines.extend(pattern)
+        lines.append("")
+    return lines[:-1]
+
+
+def generate_level14(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choices("O#.", weights=(20, 10, 70), k=size)) for _ in range(size)]
+
+
+def generate_level16(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(MIRROR_CHARS) if rng.random() < 0.1 else "." for _ in range(size))
+            for _ in range(size)]
+
+
+def generate_level17(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice("123456789") for _ in range(size)) for _ in range(size)]
+
+
+def generate_level19(size: int, seed: int = 0) -> list[str]:
+    # workflows form a tree like in the real input, so every workflow has exactly one parent
+    rng = random.Random(seed)
+    names = ["in"] + [get_name(i, 3) for i in range(1, size)]
+    next_child = 1
+    lines = []
+    for name in names:
+        targets = []
+        for _ in range(rng.randint(2, 4)):
+            if next_child < size and rng.random() < 0.7:
+                targets.append(names[next_child])
+                next_child += 1
+            else:
+                targets.append(rng.choice("AR"))
+        actions = [f"{rng.choice('xmas')}{rng.choice('<>')}{rng.randint(1, 4000)}:{target}" for target in targets[:-1]]
+        actions.append(targets[-1])
+        lines.append(f"{name}{{{','.join(actions)}}}")
+    lines.append("")
+    for _ in range(size):
+        x, m, a, s = (rng.randint(1, 4000) for _ in range(4))
+        lines.append(f"{{x={x},m={m},a={a},s={s}}}")
+    return lines
+
+
+def generate_level20(size: int, seed: int = 0) -> list[str]:
+    # size flip-flop chains, each feeding a conjunction like the counters of the real input
+    rng = random.Random(seed)
+    chain_length = 12
+    chains = [[get_name(chain * chain_length + i, 3) for i in range(chain_length)] for chain in range(size)]
+    conjunctions = [f"c{get_name(chain, 3)}" for chain in range(size)]
+    lines = [f"broadcaster -> {', '.join(chain[0] for chain in chains)}"]
+    for chain, conjunction in zip(chains, conjunctions):
+        for i, flip_flop in enumerate(chain):
+            targets = [chain[i + 1]] if i + 1 < chain_length else []
+            if rng.random() < 0.5 or not targets:
+                targets.append(conjunction)
+            lines.append(f"%{flip_flop} -> {', '.join(targets)}")
+        lines.append(f"&{conjunction} -> {chain[0]}, output")
+    return lines
+
+
+def generate_level21(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    field = [["#" if rng.random() < 0.1 else "." for _ in range(size)] for _ in range(size)]
+    field[size // 2][size // 2] = "S"
+    return list(map("".join, field))
+
+
+def generate_level22(size: int, seed: int = 0) -> list[str]:
+    # every brick gets its own z levels, so no two bricks overlap before falling
+    rng = random.Random(seed)
+    lines = []
+    z = 1
+    for _ in range(size):
+        length = rng.randint(0, 3)
+        x, y = rng.randint(0, 9), rng.randint(0, 9)
+        axis = rng.choice("xyz")
+        end_x = min(9, x + length) if axis == "x" else x
+        end_y = min(9, y + length) if axis == "y" else y
+        end_z = z + length if axis == "z" else z
+        lines.append(f"{x},{y},{z}~{end_x},{end_y},{end_z}")
+        z = end_z + 1
+    rng.shuffle(lines)
+    return lines
+
+
+def generate_level23(size: int, seed: int = 0, num_junctions: int | None = None) -> list[str]:
+    # a lattice of corridors like the real input, it gets more junctions with the size up to what the search
+    # can still handle, some inner corridors are walled off and slopes lead east and south out of random junctions
+    rng = random.Random(seed)
+    if num_junctions is None:
+        num_junctions = min(MAX_LEVEL23_JUNCTIONS, 3 + size // 24)
+    step = max(3, (size - 3) // (num_junctions - 1))
+    size = 3 + step * (num_junctions - 1)
+    lines_at = [1 + i * step for i in range(num_junctions)]
+    field = [["#"] * size for _ in range(size)]
+    for line in lines_at:
+        for i in range(1, size - 1):
+            field[line][i] = "."
+            field[i][line] = "."
+    field[0][1] = "."
+    field[size - 1][size - 2] = "."
+
+    # corridors between neighboring lattice points, only removed while every point stays connected
+    corridors = [((i, j), (i + 1, j)) for i in range(num_junctions - 1) for j in range(num_junctions)]
+    corridors += [((i, j), (i, j + 1)) for i in range(num_junctions) for j in range(num_junctions - 1)]
+    rng.shuffle(corridors)
+    kept = set(corridors)
+    for corridor in corridors:
+        if rng.random() < LEVEL23_WALLED_SHARE and _is_lattice_connected(kept - {corridor}, num_junctions):
+            kept.discard(corridor)
+            (i, j), (next_i, next_j) = corridor
+            field[(lines_at[j] + lines_at[next_j]) // 2][(lines_at[i] + lines_at[next_i]) // 2] = "#"
+
+    for x in lines_at[1:-1]:
+        for y in lines_at[1:-1]:
+            if rng.random() < 0.8:
+                field[y][x + 1] = ">"
+                field[y + 1][x] = "v"
+    return list(map("".join, field))
+
+
+def _is_lattice_connected(corridors: set[tuple[tuple[int, int], tuple[int, int]]], num_junctions: int) -> bool:
+    neighbors: dict[tuple[int, int], list[tuple[int, int]]] = {}
+    for point, next_point in corridors:
+        neighbors.setdefault(point, []).append(next_point)
+        neighbors.setdefault(next_point, []).append(point)
+    reached = {(0, 0)}
+    points_to_check = [(0, 0)]
+    while points_to_check:
+        for next_point in neighbors.get(points_to_check.pop(), []):
+            if next_point not in reached:
+                reached.add(next_point)
+                points_to_check.append(next_point)
+    return len(reached) == num_junctions * num_junctions
+
+
+def generate_level24(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        position = [rng.randint(100000000000000, 500000000000000) for _ in range(3)]
+        velocity = [rng.choice([-1, 1]) * rng.randint(1, 300) for _ in range(3)]
+        lines.append(f"{', '.join(map(str, position))} @ {', '.join(map(str, velocity))}")
+    return lines
+
+
+def generate_level25(size: int, seed: int = 0) -> list[str]:
+    # two dense halves joined by exactly three wires
+    rng = random.Random(seed)
+    names = [get_name(i, 3) for i in range(size)]
+    halves = [names[:size // 2], names[size // 2:]]
+    connections: dict[str, set[str]] = {name: set() for name in names}
+    for half in halves:
+        for i, name in enumerate(half):
+            for other in rng.sample(half[:i] + half[i + 1:], min(4, len(half) - 1)):
+                if name not in connections[other]:
+                    connections[name].add(other)
+    for left, right in zip(rng.sample(halves[0], 3), rng.sample(halves[1], 3)):
+        connections[left].add(right)
+    return [f"{name}: {' '.join(sorted(others))}" for name, others in connections.items() if others]
+
+
+GENERATORS = {
+    3: generate_level3,
+    10: generate_level10,
+    11: generate_level11,
+    12: generate_level12,
+    13: generate_level13,
+    14: generate_level14,
+    16: generate_level16,
+    17: generate_level17,
+    19: generate_level19,
+    20: generate_level20,
+    21: generate_level21,
+    22: generate_level22,
+    23: generate_level23,
+    24: generate_level24,
+    25: generate_level25,
+}
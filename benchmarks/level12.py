@@ -0,0 +1,44 @@
+import contextlib
+import io
+import os
+import tempfile
+import timeit
+
+from benchmarks.generators import generate_level12
+from solutions.level12_bfs import level12_bfs
+from solutions.level12_dfs import level12_dfs
+from solutions.level12_dp import count_arrangements, level12_dp
+from solutions.level12_naive import level12_naive
+from util.file_util import set_input_file
+
+VARIANTS = [("naive", level12_naive), ("dfs", level12_dfs), ("bfs", level12_bfs), ("dp", level12_dp)]
+
+
+def time_variant(solver, unfold: bool, repeat: int) -> float:
+    def run():
+        count_arrangements.cache_clear()
+        # naive and dfs print every row
+        with contextlib.redirect_stdout(io.StringIO()):
+            solver(unfold)
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def run_benchmark(num_rows: int = 100, repeat: int = 3, seed: int = 0):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "level12.txt")
+        with open(path, "w") as input_file:
+            input_file.write("\n".join(generate_level12(num_rows, seed)) + "\n")
+        set_input_file(12, path)
+        try:
+            print(f"{num_rows} rows, folded (best of {repeat}):")
+            for name, solver in VARIANTS:
+                print(f"  {name:10} {time_variant(solver, False, repeat):8.3f}s")
+            # the others need minutes to hours for the unfolded rows
+            print(f"{num_rows} rows, unfolded (best of {repeat}):")
+            print(f"  {'dp':10} {time_variant(level12_dp, True, repeat):8.3f}s")
+        finally:
+            set_input_file(12, None)
+
+
+if __name__ == '__main__':
+    run_benchmark()
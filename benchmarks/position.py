@@ -0,0 +1,115 @@
+import contextlib
+import importlib
+import timeit
+import tracemalloc
+
+from benchmarks.generators import generate_level21
+from benchmarks.runner import time_level
+from util.math_util import Area, Direction, Position
+
+# every module that creates positions in the measured solvers
+PATCHED_MODULES = ("util.math_util", "solutions.level21", "solutions.level23")
+
+
+class LegacyPosition:
+    # the previous dict based Position, kept to compare against
+    x: int
+    y: int
+    hash_value: int
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+        self.calc_hash()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LegacyPosition):
+            return self.x == other.x and self.y == other.y
+        return False
+
+    def __ne__(self, other) -> bool:
+        if isinstance(other, LegacyPosition):
+            return self.x != other.x or self.y != other.y
+        return True
+
+    def __add__(self, other):
+        if isinstance(other, LegacyPosition) or isinstance(other, Direction):
+            return LegacyPosition(self.x + other.x, self.y + other.y)
+        if isinstance(other, int):
+            return LegacyPosition(self.x + other, self.y + other)
+        if isinstance(other, tuple) and isinstance(other[0], int) and isinstance(other[1], int):
+            return LegacyPosition(self.x + other[0], self.y + other[1])
+        raise TypeError(f"{other} is no Position, Direction, int, or tuple[int, int]")
+
+    def __hash__(self):
+        return self.hash_value
+
+    def calc_hash(self):
+        self.hash_value = self.y * 10000000 + self.x
+
+    def is_in_bounds(self, bounds) -> bool:
+        if isinstance(bounds, LegacyPosition):
+            return 0 <= self.x < bounds.x and 0 <= self.y < bounds.y
+        raise TypeError(f"{bounds} is no Position")
+
+    def copy(self):
+        return LegacyPosition(self.x, self.y)
+
+
+@contextlib.contextmanager
+def use_position_type(position_type):
+    # the solvers look Position up in their module globals, so swapping the name swaps the class
+    modules = [importlib.import_module(name) for name in PATCHED_MODULES]
+    originals = [module.Position for module in modules]
+    for module in modules:
+        module.Position = position_type
+    try:
+        yield
+    finally:
+        for module, original in zip(modules, originals):
+            module.Position = original
+
+
+def time_flood_fill(size: int, repeat: int) -> float:
+    # the list based Area fills position by position
+    lines = [line.replace("S", ".") for line in generate_level21(size)]
+
+    def run():
+        area = Area(lines)
+        area.flood_fill(area.find_first("."), "O")
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def measure_memory(create, num_positions: int) -> int:
+    # the first round fills the intern cache, so only the second round is measured
+    warm_up = [create(i % 1000, i // 1000) for i in range(num_positions)]
+    del warm_up
+    tracemalloc.start()
+    positions = [create(i % 1000, i // 1000) for i in range(num_positions)]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del positions
+    return peak
+
+
+def run_benchmark(size: int = 201, num_positions: int = 200000, repeat: int = 3):
+    print(f"Solvers on generated {size} inputs (best of {repeat}):")
+    for name, position_type in [("legacy", LegacyPosition), ("slotted", Position)]:
+        with use_position_type(position_type):
+            runtimes = [("level21", time_level(21, size, repeat)), ("flood_fill", time_flood_fill(size, repeat)),
+                        ("level23", time_level(23, size, repeat))]
+        print(f"  {name:10} " + " ".join(f"{solver} {runtime:8.3f}s" for solver, runtime in runtimes))
+
+    print(f"Peak memory for {num_positions} positions:")
+    for name, create in [("legacy", LegacyPosition), ("slotted", Position), ("interned", Position.interned)]:
+        print(f"  {name:10} {measure_memory(create, num_positions) / 1024 / 1024:8.2f} MiB")
+
+    print(f"Hashing {num_positions} positions into a set:")
+    for name, position_type in [("legacy", LegacyPosition), ("slotted", Position)]:
+        positions = [position_type(i % 1000, i // 1000) for i in range(num_positions)]
+        runtime = min(timeit.repeat(lambda: set(positions), number=1, repeat=repeat))
+        print(f"  {name:10} {runtime:8.3f}s")
+
+
+if __name__ == '__main__':
+    run_benchmark()
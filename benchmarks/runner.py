@@ -0,0 +1,134 @@
+import importlib
+import json
+import math
+import os
+import tempfile
+import timeit
+from collections.abc import Callable
+
+from benchmarks.generators import GENERATORS
+from solutions.level12_dp import count_arrangements, level12_dp
+from solutions.level21 import level21_finite
+from solutions.level24 import level24_1
+from solutions.level25 import calc_low_couplings, parse_input_file as parse_level25
+from util.cache_util import PARSE_CACHE
+from util.file_util import set_input_file
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+
+def _call(module_name: str, function_name: str, *args) -> Callable[[int], object]:
+    # imported up front, so the first measurement doesn't include the import
+    function = getattr(importlib.import_module(f"solutions.{module_name}"), function_name)
+
+    def run(_: int):
+        return function(*args)
+    return run
+
+
+def _run_level12(_: int):
+    # the arrangement cache outlives a run, so every repetition starts cold
+    count_arrangements.cache_clear()
+    return level12_dp(True)
+
+
+def _run_level21(size: int):
+    return level21_finite(min(64, size // 2))
+
+
+def _run_level24(_: int):
+    return level24_1(200000000000000, 400000000000000)
+
+
+def _run_level25(_: int):
+    # level25 itself isn't finished, so only the coupling search is timed
+    return len(calc_low_couplings(parse_level25()))
+
+
+# level -> (solver taking the size, default size sweep)
+BENCHMARKS: dict[int, tuple[Callable[[int], object], list[int]]] = {
+    3: (_call("level3", "level3"), [50, 100, 200, 400]),
+    10: (_call("level10", "level10"), [250, 500, 1000, 2000]),
+    11: (_call("level11", "level11", 1000000), [250, 500, 1000, 2000]),
+    12: (_run_level12, [100, 200, 400, 800]),
+    13: (_call("level13", "level13", True), [50, 100, 200, 400]),
+    14: (_call("level14", "level14_2"), [25, 50, 100, 200]),
+    16: (_call("level16", "level16"), [50, 100, 200]),
+    17: (_call("level17", "level17", range(1, 4)), [20, 40, 80]),
+    19: (_call("level19", "level19"), [50, 100, 200, 400]),
+    20: (_call("level20", "level20"), [1, 2, 4, 8]),
+    21: (_run_level21, [25, 50, 100, 200]),
+    22: (_call("level22", "level22"), [500, 1000, 2000, 4000]),
+    23: (_call("level23", "level23"), [23, 43, 83, 163]),
+    24: (_run_level24, [50, 100, 200, 400]),
+    25: (_run_level25, [100, 200, 400, 800]),
+}
+
+
+def time_level(level_id: int, size: int, repeat: int = 3, seed: int = 0) -> float:
+    solver, _ = BENCHMARKS[level_id]
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, f"level{level_id}.txt")
+        with open(path, "w") as input_file:
+            input_file.write("\n".join(GENERATORS[level_id](size, seed)) + "\n")
+        set_input_file(level_id, path)
+        def run():
+            # parsed inputs outlive a run as well, so every repetition parses again
+            PARSE_CACHE.clear()
+            return solver(size)
+
+        try:
+            return min(timeit.repeat(run, number=1, repeat=repeat))
+        finally:
+            set_input_file(level_id, None)
+
+
+def fit_scaling_exponent(sizes: list[int], runtimes: list[float]) -> float:
+    # least squares fit of log(runtime) = a + b * log(size), returns b
+    points = [(math.log(size), math.log(max(runtime, 1e-9))) for size, runtime in zip(sizes, runtimes)]
+    if len(points) < 2:
+        return float("nan")
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def load_baselines(path: str = BASELINE_FILE) -> dict[str, dict[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baselines(baselines: dict[str, dict[str, float]], path: str = BASELINE_FILE):
+    with open(path, "w") as baseline_file:
+        json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+
+
+def run_benchmarks(level_ids: list[int], sizes: list[int] | None = None, repeat: int = 3,
+                   tolerance: float = 0.25, save_baseline: bool = False) -> list[str]:
+    baselines = load_baselines()
+    regressions = []
+    for level_id in level_ids:
+        level_sizes = sizes or BENCHMARKS[level_id][1]
+        runtimes = []
+        level_baseline = baselines.setdefault(str(level_id), {})
+        for size in level_sizes:
+            runtime = time_level(level_id, size, repeat)
+            runtimes.append(runtime)
+            baseline = level_baseline.get(str(size))
+            status = ""
+            if baseline is not None:
+                status = f" baseline {baseline:.4f}s"
+                if runtime > baseline * (1 + tolerance):
+                    status += " REGRESSION"
+                    regressions.append(f"level{level_id} size {size}: {runtime:.4f}s > {baseline:.4f}s")
+            print(f"level{level_id:<3} size {size:>6}: {runtime:.4f}s{status}")
+            if save_baseline:
+                level_baseline[str(size)] = runtime
+        print(f"level{level_id:<3} scales like O(n^{fit_scaling_exponent(level_sizes, runtimes):.2f})")
+
+    if save_baseline:
+        save_baselines(baselines)
+    return regressions
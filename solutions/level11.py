@@ -1,70 +1,71 @@
-from util.data_util import transpose
-from util.file_util import read_input_file
+from collections.abc import Iterable
 
-
-def find_empty_lines(field: list[list[str]]) -> list[int]:
-    return list(
-        map(lambda result: result[0],
-            filter(lambda line: line[1].count(".") == len(line[1]),
-                   enumerate(field))))
+from util.file_util import iter_input_file
 
 
 class Universe:
-    field: list[list[str]]
-    galaxies: list[tuple[int, int]]
-    empty_lines: list[int]
-    empty_cols: list[int]
-
-    def __init__(self, field: list[str]):
-        self.field = list(map(list, field))
-        self.empty_lines = find_empty_lines(self.field)
-        self.empty_cols = find_empty_lines(transpose(self.field))
-        self.galaxies = self.__find_galaxies()
+    # only the number of galaxies per row and column is kept, the image itself is streamed
+    row_counts: list[int]
+    col_counts: list[int]
 
-    def __find_galaxies(self) -> list[tuple[int, int]]:
-        galaxies = []
-        for y, line in enumerate(self.field):
-            for x, char in enumerate(line):
-                if char == "#":
-                    galaxies.append((x, y))
-        return galaxies
+    def __init__(self, lines: Iterable[str]):
+        self.row_counts = []
+        self.col_counts = []
+        for line in lines:
+            if len(line) > len(self.col_counts):
+                self.col_counts.extend([0] * (len(line) - len(self.col_counts)))
+            num_galaxies = 0
+            x = line.find("#")
+            while x != -1:
+                self.col_counts[x] += 1
+                num_galaxies += 1
+                x = line.find("#", x + 1)
+            self.row_counts.append(num_galaxies)
 
-    def get_distance(self, galaxy1: tuple[int, int], galaxy2: tuple[int, int], expand_by: int) -> int:
+    @staticmethod
+    def get_axis_sums(counts: list[int]) -> tuple[int, int]:
+        # sums over all pairs of the distance and of the empty lines in between, walking the sorted coordinates once
         sum_distances = 0
-        sum_distances += abs(galaxy1[0] - galaxy2[0])
-        sum_distances += abs(galaxy1[1] - galaxy2[1])
-        sum_distances += sum(
-            min(galaxy1[1], galaxy2[1]) < line < max(galaxy1[1], galaxy2[1])
-            for line in self.empty_lines
-        ) * (expand_by - 1)
-        sum_distances += sum(
-            min(galaxy1[0], galaxy2[0]) < col < max(galaxy1[0], galaxy2[0])
-            for col in self.empty_cols
-        ) * (expand_by - 1)
-        return sum_distances
+        sum_empty = 0
+        num_seen = 0
+        sum_seen_coordinates = 0
+        sum_seen_empty = 0
+        num_empty = 0
+        for coordinate, count in enumerate(counts):
+            if count == 0:
+                num_empty += 1
+                continue
+            sum_distances += count * (coordinate * num_seen - sum_seen_coordinates)
+            sum_empty += count * (num_empty * num_seen - sum_seen_empty)
+            num_seen += count
+            sum_seen_coordinates += count * coordinate
+            sum_seen_empty += count * num_empty
+        return sum_distances, sum_empty
+
+    def get_sum_distances(self, expansions: Iterable[int]) -> list[int]:
+        # every empty line adds expand_by - 1 to each pair across it
+        row_distances, row_empty = self.get_axis_sums(self.row_counts)
+        col_distances, col_empty = self.get_axis_sums(self.col_counts)
+        return [row_distances + col_distances + (expand_by - 1) * (row_empty + col_empty) for expand_by in expansions]
 
 
 def level11(expand_by: int) -> int:
     universe = parse_input_file()
-    sum_distances = 0
-    for i in range(0, len(universe.galaxies)):
-        galaxy1 = universe.galaxies[i]
-        for galaxy2 in universe.galaxies[(i+1):]:
-            sum_distances += universe.get_distance(galaxy1, galaxy2, expand_by)
-    return sum_distances
+    return universe.get_sum_distances([expand_by])[0]
 
 
 def parse_input_file() -> Universe:
-    lines = read_input_file(11)
-    return Universe(lines)
+    return Universe(iter_input_file(11))
 
 
 if __name__ == '__main__':
-    print("Sum distances (expand 2): " + str(level11(2)))
-    print("Sum distances (expand 1000000): " + str(level11(1000000)))
+    sum_distances = parse_input_file().get_sum_distances([2, 1000000])
+    print("Sum distances (expand 2): " + str(sum_distances[0]))
+    print("Sum distances (expand 1000000): " + str(sum_distances[1]))
 
 
 def test_level11():
     assert 374 == level11(2)
     assert 1030 == level11(10)
     assert 8410 == level11(100)
+    assert [374, 1030, 8410] == parse_input_file().get_sum_distances([2, 10, 100])
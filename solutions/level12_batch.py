@@ -0,0 +1,131 @@
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+from solutions.level12_naive import split_input_line
+from util.file_util import iter_input_file
+from util.run_util import RunTimer
+
+CHUNK_SIZE = 10000
+
+
+class SpringAutomaton:
+    # NFA of the pattern .*#{g1}.+#{g2}.+ ... #{gn}.* with one state per character
+    num_states: int
+    loops_on_dot: list[bool]
+    next_on_dot: list[bool]
+    next_on_hash: list[bool]
+
+    def __init__(self, groups: tuple[int, ...]):
+        pattern = "." + ".".join("#" * group for group in groups) + "."
+        self.num_states = len(pattern)
+        self.loops_on_dot = [char == "." for char in pattern]
+        self.next_on_dot = [i + 1 < len(pattern) and pattern[i + 1] == "." and char == "#"
+                            for i, char in enumerate(pattern)]
+        self.next_on_hash = [i + 1 < len(pattern) and pattern[i + 1] == "#" for i in range(len(pattern))]
+
+    def count(self, row: str) -> int:
+        counts = [0] * self.num_states
+        counts[0] = 1
+        for char in row:
+            new_counts = [0] * self.num_states
+            may_be_dot = char != "#"
+            may_be_hash = char != "."
+            for state, num in enumerate(counts):
+                if num == 0:
+                    continue
+                if may_be_dot:
+                    if self.loops_on_dot[state]:
+                        new_counts[state] += num
+                    elif self.next_on_dot[state]:
+                        new_counts[state + 1] += num
+                if may_be_hash and self.next_on_hash[state]:
+                    new_counts[state + 1] += num
+            counts = new_counts
+        # the pattern may end right after the last group
+        return counts[-1] + counts[-2]
+
+
+class BatchResult:
+    num_arrangements: int
+    num_rows: int
+    runtime: float
+
+    def __init__(self, num_arrangements: int, num_rows: int, runtime: float):
+        self.num_arrangements = num_arrangements
+        self.num_rows = num_rows
+        self.runtime = runtime
+
+    def get_rows_per_second(self) -> float:
+        return self.num_rows / self.runtime if self.runtime > 0 else float("inf")
+
+
+def level12_batch(unfold: bool, num_workers: int | None = None) -> int:
+    return count_file_arrangements(unfold, num_workers).num_arrangements
+
+
+@lru_cache(maxsize=4096)
+def get_automaton(groups: tuple[int, ...]) -> SpringAutomaton:
+    return SpringAutomaton(groups)
+
+
+def count_chunk(lines: list[str], unfold: bool) -> int:
+    # rows with the same groups share one compiled automaton
+    rows_by_groups: dict[tuple[int, ...], list[str]] = {}
+    for line in lines:
+        row, definition = split_input_line(line)
+        if unfold:
+            row, definition = row + ("?" + row) * 4, definition * 5
+        rows_by_groups.setdefault(tuple(definition), []).append(row.strip("."))
+
+    num_arrangements = 0
+    for groups, rows in rows_by_groups.items():
+        automaton = get_automaton(groups)
+        num_arrangements += sum(map(automaton.count, rows))
+    return num_arrangements
+
+
+def iter_chunks(level_id: int, file_id: int, chunk_size: int):
+    lines = filter(None, iter_input_file(level_id, file_id))
+    while chunk := list(itertools.islice(lines, chunk_size)):
+        yield chunk
+
+
+def count_file_arrangements(unfold: bool, num_workers: int | None = None, chunk_size: int = CHUNK_SIZE,
+                            level_id: int = 12, file_id: int = 0) -> BatchResult:
+    timer = RunTimer()
+    num_arrangements = 0
+    num_rows = 0
+    if num_workers == 1:
+        for chunk in iter_chunks(level_id, file_id, chunk_size):
+            num_arrangements += count_chunk(chunk, unfold)
+            num_rows += len(chunk)
+        return BatchResult(num_arrangements, num_rows, timer.get_time())
+
+    num_workers = num_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(num_workers) as executor:
+        # only a few chunks per worker are in flight, so memory stays flat for huge files
+        max_pending = 2 * num_workers
+        pending: set[Future] = set()
+        for chunk in iter_chunks(level_id, file_id, chunk_size):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                num_arrangements += sum(future.result() for future in done)
+            pending.add(executor.submit(count_chunk, chunk, unfold))
+            num_rows += len(chunk)
+        num_arrangements += sum(future.result() for future in pending)
+    return BatchResult(num_arrangements, num_rows, timer.get_time())
+
+
+if __name__ == '__main__':
+    for unfold in (False, True):
+        result = count_file_arrangements(unfold)
+        print(f"Sum possible arrangements ({'unfolded' if unfold else 'folded'}): {result.num_arrangements} "
+              f"({result.num_rows} rows, {result.get_rows_per_second():.0f} rows/s)")
+
+
+def test_level12():
+    assert 21 == level12_batch(False, 1)
+    assert 525152 == level12_batch(True, 1)
+    assert 525152 == count_file_arrangements(True, 2, chunk_size=2).num_arrangements
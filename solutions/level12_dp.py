@@ -0,0 +1,51 @@
+from functools import lru_cache
+
+from solutions.level12_naive import parse_input_file
+
+# shared by all rows, a row that comes up again with the same groups is only counted once
+CACHE_SIZE = 1 << 18
+
+
+def level12_dp(unfold: bool) -> int:
+    rows = parse_input_file(unfold)
+    return sum(map(lambda row: get_num_arrangements(row[0], row[1]), rows))
+
+
+def get_num_arrangements(row: str, definition: list[int]) -> int:
+    return count_arrangements(row.strip("."), tuple(definition))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def count_arrangements(springs: str, groups: tuple[int, ...]) -> int:
+    # bottom up from the last group, counts[i] is the number of arrangements of the remaining groups in
+    # springs[i:], a group is always placed as a whole, so every layer is a single pass over the row
+    length = len(springs)
+    next_dots = [length] * (length + 1)
+    for i in range(length - 1, -1, -1):
+        next_dots[i] = i if springs[i] == "." else next_dots[i + 1]
+
+    counts = [0] * length + [1]
+    for i in range(length - 1, -1, -1):
+        if springs[i] != "#":
+            counts[i] = counts[i + 1]
+
+    for group in reversed(groups):
+        group_counts = [0] * (length + 1)
+        for i in range(length - group, -1, -1):
+            num_arrangements = group_counts[i + 1] if springs[i] != "#" else 0
+            end = i + group
+            if next_dots[i] >= end and (end == length or springs[end] != "#"):
+                num_arrangements += counts[min(end + 1, length)]
+            group_counts[i] = num_arrangements
+        counts = group_counts
+    return counts[0]
+
+
+if __name__ == '__main__':
+    print("Sum possible arrangements (folded): " + str(level12_dp(False)))
+    print("Sum possible arrangements (unfolded): " + str(level12_dp(True)))
+
+
+def test_level12():
+    assert 21 == level12_dp(False)
+    assert 525152 == level12_dp(True)
@@ -1,5 +1,7 @@
+from collections.abc import Iterator
+
 from util.data_util import transpose
-from util.file_util import read_input_file
+from util.file_util import iter_input_blocks
 
 
 def level13(with_smudge: bool) -> int:
@@ -15,21 +17,9 @@ def level13(with_smudge: bool) -> int:
     return total_sum
 
 
-def parse_input_file() -> list[list[list[str]]]:
-    lines = read_input_file(13)
-    areas = []
-    next_area = []
-    for line in lines:
-        if line == "":
-            areas.append(next_area)
-            next_area = []
-        else:
-            next_area.append(list(line))
-
-    if next_area:
-        areas.append(next_area)
-
-    return areas
+def parse_input_file() -> Iterator[list[list[str]]]:
+    for block in iter_input_blocks(13):
+        yield list(map(list, block))
 
 
 def get_num_reflected_rows(field: list[list[str]], with_smudge: bool) -> int:
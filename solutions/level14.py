@@ -1,122 +1,172 @@
-import math
+import hashlib
+import itertools
+import operator
 
 from util.file_util import read_input_file
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NORTH, WEST, SOUTH, EAST = range(4)
+SPIN_CYCLE = (NORTH, WEST, SOUTH, EAST)
+
+
+class Platform:
+    # rocks and cubes are flat row by row, a tilt counts the rocks per segment between cubes and
+    # refills every segment from the side it is tilted to
+    width: int
+    height: int
+    rocks: bytearray
+    cubes: bytearray
+    tilts: list[tuple[list[int], list[int], int]]
+
+    def __init__(self, lines: list[str]):
+        self.height = len(lines)
+        self.width = len(lines[0])
+        cells = "".join(lines)
+        self.rocks = bytearray(char == "O" for char in cells)
+        self.cubes = bytearray(char == "#" for char in cells)
+        self._init_tilts()
+
+    def _init_tilts(self):
+        self.tilts = [self._calc_segments(direction) for direction in range(4)]
+
+    def _get_lines(self, direction: int) -> list[range]:
+        # every line starts at the side the rocks roll to
+        width, size = self.width, self.width * self.height
+        if direction == NORTH:
+            return [range(x, size, width) for x in range(width)]
+        if direction == SOUTH:
+            return [range(size - width + x, -1, -width) for x in range(width)]
+        if direction == WEST:
+            return [range(y * width, (y + 1) * width) for y in range(self.height)]
+        return [range((y + 1) * width - 1, y * width - 1, -1) for y in range(self.height)]
+
+    def _calc_segments(self, direction: int) -> tuple[list[int], list[int], int]:
+        # segment and offset in the segment of every cell, a cube is a segment of its own that never gets a rock
+        segment_ids = [0] * len(self.cubes)
+        offsets = [0] * len(self.cubes)
+        num_segments = 0
+        for line in self._get_lines(direction):
+            offset = 0
+            num_segments += 1
+            for i in line:
+                if self.cubes[i]:
+                    num_segments += 1
+                    segment_ids[i] = num_segments - 1
+                    num_segments += 1
+                    offset = 0
+                else:
+                    segment_ids[i] = num_segments - 1
+                    offsets[i] = offset
+                    offset += 1
+        return segment_ids, offsets, num_segments
+
+    def tilt(self, direction: int):
+        segment_ids, offsets, num_segments = self.tilts[direction]
+        counts = [0] * num_segments
+        for segment_id in itertools.compress(segment_ids, self.rocks):
+            counts[segment_id] += 1
+        self.rocks = bytearray(map(operator.lt, offsets, map(counts.__getitem__, segment_ids)))
+
+    def spin_cycle(self):
+        for direction in SPIN_CYCLE:
+            self.tilt(direction)
+
+    def get_state(self) -> bytes:
+        return bytes(self.rocks)
+
+    def get_north_load(self) -> int:
+        width = self.width
+        return sum((self.height - y) * self.rocks[y * width:(y + 1) * width].count(1) for y in range(self.height))
+
+    def get_load_after_cycles(self, num_cycles: int) -> int:
+        # a digest of the exact state is remembered, so a repeat is found right when it appears
+        seen_states = {}
+        loads = []
+        for cycle in range(num_cycles):
+            state = hashlib.blake2b(self.get_state(), digest_size=16).digest()
+            if state in seen_states:
+                loop_start = seen_states[state]
+                return loads[loop_start + (num_cycles - loop_start) % (cycle - loop_start)]
+            seen_states[state] = cycle
+            loads.append(self.get_north_load())
+            self.spin_cycle()
+        return self.get_north_load()
+
+
+class NumpyPlatform(Platform):
+    rock_grid: "np.ndarray"
+    row_loads: "np.ndarray"
+
+    def __init__(self, lines: list[str]):
+        if np is None:
+            raise ImportError("NumpyPlatform requires numpy")
+        self.height = len(lines)
+        self.width = len(lines[0])
+        grid = np.frombuffer("".join(lines).encode("latin-1"), dtype=np.uint8).reshape(self.height, self.width)
+        self.rock_grid = grid == ord("O")
+        self.cubes = grid == ord("#")
+        self.row_loads = np.arange(self.height, 0, -1)
+        self._init_tilts()
+
+    def _calc_segments(self, direction: int) -> tuple["np.ndarray", "np.ndarray", int]:
+        indices = np.arange(self.width * self.height).reshape(self.height, self.width)
+        views = {NORTH: lambda grid: grid.T, SOUTH: lambda grid: grid[::-1].T,
+                 WEST: lambda grid: grid, EAST: lambda grid: grid[:, ::-1]}
+        cubes = views[direction](self.cubes)
+        num_lines, line_length = cubes.shape
+
+        # a segment starts at the beginning of a line, at a cube and right after one
+        starts = np.ones(cubes.shape, dtype=bool)
+        starts[:, 1:] = cubes[:, 1:] | cubes[:, :-1]
+        positions = np.broadcast_to(np.arange(line_length), cubes.shape)
+        segment_starts = np.maximum.accumulate(np.where(starts, positions, 0), axis=1)
+        line_segment_ids = np.cumsum(starts.ravel()) - 1
+        line_offsets = positions - segment_starts
+
+        segment_ids = np.empty(self.width * self.height, dtype=np.int32)
+        offsets = np.empty(self.width * self.height, dtype=np.int32)
+        cell_indices = views[direction](indices).ravel()
+        segment_ids[cell_indices] = line_segment_ids
+        offsets[cell_indices] = line_offsets.ravel()
+        return segment_ids, offsets, int(line_segment_ids[-1]) + 1
+
+    def tilt(self, direction: int):
+        segment_ids, offsets, num_segments = self.tilts[direction]
+        rocks = self.rock_grid.ravel()
+        counts = np.bincount(segment_ids[rocks], minlength=num_segments)
+        self.rock_grid = (offsets < counts[segment_ids]).reshape(self.height, self.width)
+
+    def get_state(self) -> bytes:
+        return np.packbits(self.rock_grid).tobytes()
+
+    def get_north_load(self) -> int:
+        return int(self.row_loads @ self.rock_grid.sum(axis=1))
+
+
+def create_platform(lines: list[str]) -> Platform:
+    if np is not None:
+        return NumpyPlatform(lines)
+    return Platform(lines)
+
 
 def level14_1() -> int:
-    field = parse_input_file()
-    tilt_north(field)
-    return get_total_weight(field)
+    platform = parse_input_file()
+    platform.tilt(NORTH)
+    return platform.get_north_load()
 
 
 def level14_2() -> int:
-    field = parse_input_file()
-    weights = []
-    num_repetitions = 500
-
-    for _ in range(0, num_repetitions):
-        tilt_north(field)
-        tilt_west(field)
-        tilt_south(field)
-        tilt_east(field)
-        weights.append(get_total_weight(field))
-
-    return get_weight_by_extrapolate_patterns(weights, 1000000000)
+    platform = parse_input_file()
+    return platform.get_load_after_cycles(1000000000)
 
 
-def parse_input_file() -> list[list[str]]:
+def parse_input_file() -> Platform:
     lines = read_input_file(14)
-    return list(map(list, lines))
-
-
-def find_stones(field: list[list[str]]) -> list[tuple[int, int]]:
-    stones = []
-    for y in range(0, len(field)):
-        for x in range(0, len(field[0])):
-            if field[y][x] == "O":
-                stones.append((x, y))
-    return stones
-
-
-def tilt_north(field: list[list[str]]):
-    for y in range(0, len(field)):
-        for x in range(0, len(field[0])):
-            if field[y][x] == "O":
-                move_to = y
-                while move_to > 0 and field[move_to - 1][x] == ".":
-                    move_to -= 1
-                field[y][x] = "."
-                field[move_to][x] = "O"
-
-
-def tilt_south(field: list[list[str]]):
-    for y in reversed(range(0, len(field) - 1)):
-        for x in range(0, len(field[0])):
-            if field[y][x] == "O":
-                move_to = y
-                while move_to < len(field) - 1 and field[move_to + 1][x] == ".":
-                    move_to += 1
-                field[y][x] = "."
-                field[move_to][x] = "O"
-
-
-def tilt_west(field: list[list[str]]):
-    for x in range(0, len(field[0])):
-        for y in range(0, len(field)):
-            if field[y][x] == "O":
-                move_to = x
-                while move_to > 0 and field[y][move_to - 1] == ".":
-                    move_to -= 1
-                field[y][x] = "."
-                field[y][move_to] = "O"
-
-
-def tilt_east(field: list[list[str]]):
-    for x in reversed(range(0, len(field[0]))):
-        for y in range(0, len(field)):
-            if field[y][x] == "O":
-                move_to = x
-                while move_to < len(field) - 1 and field[y][move_to + 1] == ".":
-                    move_to += 1
-                field[y][x] = "."
-                field[y][move_to] = "O"
-
-
-def get_total_weight(field: list[list[str]]) -> int:
-    height = len(field)
-    total_sum = 0
-    for i, line in enumerate(field):
-        total_sum += line.count("O") * (height - i)
-    return total_sum
-
-
-def get_weight_by_extrapolate_patterns(weights: list[int], total_cycles: int) -> int:
-    pattern_length = find_pattern_length(weights)
-    how_many_more_patterns = math.ceil((total_cycles - len(weights)) / pattern_length)
-    pattern_end_after_filling_up = len(weights) + pattern_length * how_many_more_patterns
-    overshoot = pattern_end_after_filling_up - total_cycles
-    return weights[-1-overshoot]
-
-
-def find_pattern_length(weights: list[int]) -> int:
-    min_pattern_length = 10
-    for check_back_i in range(min_pattern_length, len(weights) - 1):
-        pattern_length = check_back_i + 1
-        if is_pattern(weights, pattern_length):
-            return pattern_length
-    return -1
-
-
-def is_pattern(weights: list[int], pattern_length: int) -> int:
-    num_to_find = weights[-1]
-    if weights[-1 - pattern_length] == num_to_find and weights[-1 - pattern_length * 2] == num_to_find:
-        for pattern_i in range(1, pattern_length):
-            pattern_num = weights[-1-pattern_i]
-            if (weights[-1 - pattern_length - pattern_i] != pattern_num and
-                    weights[-1 - pattern_length * 2 - pattern_i] != pattern_num):
-                return False
-        return True
-    return False
+    return create_platform(lines)
 
 
 if __name__ == '__main__':
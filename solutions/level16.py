@@ -1,5 +1,7 @@
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 
+from util.cache_util import cached_parse
 from util.file_util import read_input_file
 
 
@@ -107,21 +109,213 @@ class Beam:
         self.__move_empty()
 
 
-def level16() -> tuple[int, int]:
+# direction after passing a tile, by tile and direction of the beam coming in
+DELTAS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+OUTGOING = {
+    ".": ((0,), (1,), (2,), (3,)),
+    "/": ((1,), (0,), (3,), (2,)),
+    "\\": ((3,), (2,), (1,), (0,)),
+    "|": ((0,), (0, 2), (2,), (0, 2)),
+    "-": ((1, 3), (1,), (1, 3), (3,)),
+}
+
+
+# components with at least this many nodes keep the tiles of everything they reach, the others only their own
+CLOSURE_MIN_NODES = 32
+
+
+class BeamGraph:
+    # a node is a beam hitting a mirror or splitter that changes its direction, the tiles a beam crosses are
+    # slices of the flat field y * width + x, and a tile set is a bytearray with a 1 per energized tile
+    width: int
+    height: int
+    definition: list[str]
+    node_ids: dict[tuple[int, int, int], int]
+    node_segments: list[list[tuple[slice, int]]]
+    node_edges: list[list[int]]
+    component_ids: list[int]
+    component_segments: list[list[tuple[slice, int]]]
+    component_edges: list[list[int]]
+    closures: dict[int, int]
+    ones: bytes
+
+    def __init__(self, definition: list[str]):
+        self.definition = definition
+        self.width = len(definition[0])
+        self.height = len(definition)
+        # a segment is never longer than a row or column
+        self.ones = b"\x01" * max(self.width, self.height)
+        self.node_ids = {}
+        for y, line in enumerate(definition):
+            for x, char in enumerate(line):
+                for direction in range(4):
+                    if OUTGOING[char][direction] != (direction,):
+                        self.node_ids[(x, y, direction)] = len(self.node_ids)
+
+        self.node_segments = [[] for _ in self.node_ids]
+        self.node_edges = [[] for _ in self.node_ids]
+        for (x, y, direction), node_id in self.node_ids.items():
+            segments = self.node_segments[node_id]
+            segments.append((slice(y * self.width + x, y * self.width + x + 1), 1))
+            for next_direction in OUTGOING[definition[y][x]][direction]:
+                delta_x, delta_y = DELTAS[next_direction]
+                segment, next_node_id = self.trace(x + delta_x, y + delta_y, next_direction)
+                if segment is not None:
+                    segments.append(segment)
+                if next_node_id >= 0:
+                    self.node_edges[node_id].append(next_node_id)
+        self._collapse_components()
+
+    def trace(self, x: int, y: int, direction: int) -> tuple[tuple[slice, int] | None, int]:
+        # follows the beam straight until it leaves the field or reaches the next node,
+        # returns the crossed tiles with their number and the node
+        delta_x, delta_y = DELTAS[direction]
+        step = delta_y * self.width + delta_x
+        first = y * self.width + x
+        length = 0
+        node_id = -1
+        while 0 <= x < self.width and 0 <= y < self.height:
+            length += 1
+            node_id = self.node_ids.get((x, y, direction), -1)
+            if node_id >= 0:
+                break
+            x += delta_x
+            y += delta_y
+        if length == 0:
+            return None, node_id
+        stop = first + length * step
+        return (slice(first, stop if stop >= 0 else None, step), length), node_id
+
+    def _collapse_components(self):
+        # iterative tarjan, components are found successors first, so their closures can be built right away
+        num_nodes = len(self.node_segments)
+        self.component_ids = [-1] * num_nodes
+        self.component_segments = []
+        self.component_edges = []
+        self.closures = {}
+        indices = [-1] * num_nodes
+        low_links = [0] * num_nodes
+        on_stack = [False] * num_nodes
+        stack = []
+        index = 0
+        for root in range(num_nodes):
+            if indices[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                node_id, edge_i = work.pop()
+                if edge_i == 0:
+                    indices[node_id] = low_links[node_id] = index
+                    index += 1
+                    stack.append(node_id)
+                    on_stack[node_id] = True
+                elif edge_i > 0:
+                    child_id = self.node_edges[node_id][edge_i - 1]
+                    low_links[node_id] = min(low_links[node_id], low_links[child_id])
+
+                edges = self.node_edges[node_id]
+                while edge_i < len(edges):
+                    child_id = edges[edge_i]
+                    edge_i += 1
+                    if indices[child_id] == -1:
+                        work.append((node_id, edge_i))
+                        work.append((child_id, 0))
+                        break
+                    if on_stack[child_id]:
+                        low_links[node_id] = min(low_links[node_id], indices[child_id])
+                else:
+                    if low_links[node_id] == indices[node_id]:
+                        self._add_component(node_id, stack, on_stack)
+
+    def _add_component(self, root_id: int, stack: list[int], on_stack: list[bool]):
+        component_id = len(self.component_segments)
+        members = []
+        while True:
+            node_id = stack.pop()
+            on_stack[node_id] = False
+            self.component_ids[node_id] = component_id
+            members.append(node_id)
+            if node_id == root_id:
+                break
+        segments = []
+        next_component_ids = set()
+        for node_id in members:
+            segments.extend(self.node_segments[node_id])
+            for child_id in self.node_edges[node_id]:
+                if self.component_ids[child_id] != component_id:
+                    next_component_ids.add(self.component_ids[child_id])
+        self.component_segments.append(segments)
+        self.component_edges.append(sorted(next_component_ids))
+        if len(members) >= CLOSURE_MIN_NODES:
+            tiles = bytearray(self.width * self.height)
+            closure = self._collect_tiles(component_id, tiles)
+            self.closures[component_id] = int.from_bytes(tiles, "little") | closure
+
+    def _collect_tiles(self, component_id: int, tiles: bytearray) -> int:
+        # marks the tiles of every component reachable from the given one, stopping at components with a
+        # closure, those are returned or-ed together in the same one byte per tile layout as an int
+        closure = 0
+        visited = {component_id}
+        components_to_visit = [component_id]
+        while components_to_visit:
+            component_id = components_to_visit.pop()
+            component_closure = self.closures.get(component_id)
+            if component_closure is not None:
+                closure |= component_closure
+                continue
+            for segment, length in self.component_segments[component_id]:
+                tiles[segment] = self.ones[:length]
+            for next_component_id in self.component_edges[component_id]:
+                if next_component_id not in visited:
+                    visited.add(next_component_id)
+                    components_to_visit.append(next_component_id)
+        return closure
+
+    def get_energy_level(self, x: int, y: int, direction: int) -> int:
+        tiles = bytearray(self.width * self.height)
+        segment, node_id = self.trace(x, y, direction)
+        if segment is not None:
+            tiles[segment[0]] = self.ones[:segment[1]]
+        closure = self._collect_tiles(self.component_ids[node_id], tiles) if node_id >= 0 else 0
+        if closure:
+            return (int.from_bytes(tiles, "little") | closure).bit_count()
+        return tiles.count(1)
+
+    def get_edge_starts(self) -> list[tuple[int, int, int]]:
+        starts = []
+        for y in range(self.height):
+            starts.append((0, y, Direction.RIGHT.value))
+            starts.append((self.width - 1, y, Direction.LEFT.value))
+        for x in range(self.width):
+            starts.append((x, 0, Direction.DOWN.value))
+            starts.append((x, self.height - 1, Direction.UP.value))
+        return starts
+
+
+_worker_graph: BeamGraph | None = None
+
+
+def _init_worker(definition: list[str]):
+    global _worker_graph
+    _worker_graph = BeamGraph(definition)
+
+
+def _get_max_energy_level(starts: list[tuple[int, int, int]]) -> int:
+    return max(_worker_graph.get_energy_level(*start) for start in starts)
+
+
+def level16(num_workers: int = 1) -> tuple[int, int]:
     field = parse_input_file()
-    top_left_to_right = level16_attempt(Beam(field, 0, 0, Direction.RIGHT))
-    top_right_to_left = level16_attempt(Beam(field, len(field.definition[0]) - 1, 0, Direction.LEFT))
-    max_energy_level = max(top_left_to_right, top_right_to_left)
-    for y in range(1, len(field.definition)):
-        max_energy_level = max(max_energy_level,
-                               level16_attempt(Beam(field, 0, y, Direction.RIGHT)),
-                               level16_attempt(Beam(field, len(field.definition[0]) - 1, y, Direction.LEFT))
-                               )
-    for x in range(0, len(field.definition)):
-        max_energy_level = max(max_energy_level,
-                               level16_attempt(Beam(field, x, 0, Direction.DOWN)),
-                               level16_attempt(Beam(field, x, len(field.definition) - 1, Direction.UP))
-                               )
+    graph = BeamGraph(field.definition)
+    top_left_to_right = graph.get_energy_level(0, 0, Direction.RIGHT.value)
+    starts = graph.get_edge_starts()
+    if num_workers == 1:
+        max_energy_level = max(graph.get_energy_level(*start) for start in starts)
+    else:
+        # every worker builds its own graph, which is cheaper than pickling the tile sets
+        chunks = [starts[i::num_workers] for i in range(num_workers)]
+        with ProcessPoolExecutor(num_workers, initializer=_init_worker, initargs=(field.definition,)) as executor:
+            max_energy_level = max(executor.map(_get_max_energy_level, chunks))
     return top_left_to_right, max_energy_level
 
 
@@ -140,6 +334,7 @@ def level16_attempt(starting_beam: Beam) -> int:
     return field.get_energy_level()
 
 
+@cached_parse(16)
 def parse_input_file() -> Field:
     lines = read_input_file(16)
     return Field(lines)
@@ -151,3 +346,4 @@ if __name__ == '__main__':
 
 def test_level16():
     assert (46, 51) == level16()
+    assert (46, 51) == level16(2)
@@ -2,6 +2,7 @@ from collections import defaultdict
 from enum import Enum
 from math import sqrt
 
+from util.cache_util import cached_parse
 from util.data_util import create_2d_list
 from util.file_util import read_input_file
 from util.math_util import Direction, Position, Area, is_turn_right, is_turn_left, clamp
@@ -41,6 +42,7 @@ class Field(Enum):
     Dug = "#"
 
 
+@cached_parse(18)
 def parse_input_file(flip: bool) -> list[Command]:
     return list(map(lambda x: Command(x, flip), read_input_file(18)))
 
@@ -53,10 +55,8 @@ def level18_flood_fill(flip: bool) -> int:
     max_position = Position(0, 0)
     for command in commands:
         position += command.direction * command.distance
-        min_position.x = min(position.x, min_position.x)
-        min_position.y = min(position.y, min_position.y)
-        max_position.x = max(position.x, max_position.x)
-        max_position.y = max(position.y, max_position.y)
+        min_position = Position(min(position.x, min_position.x), min(position.y, min_position.y))
+        max_position = Position(max(position.x, max_position.x), max(position.y, max_position.y))
 
     dimensions = max_position - min_position
     field = create_2d_list(dimensions.x + 1, dimensions.y + 1, Field.Not_Dug)
@@ -1,7 +1,6 @@
 from enum import Enum
 
-from util.data_util import split_input_when_empty
-from util.file_util import read_input_file
+from util.file_util import iter_input_blocks
 from util.run_util import RunTimer
 
 
@@ -220,11 +219,10 @@ class Workflow:
 
 
 def parse_input_file() -> tuple[dict[str, Workflow], list[Part]]:
-    lines = read_input_file(19)
-    input_parts = split_input_when_empty(lines)
-    workflows = list(map(Workflow, input_parts[0]))
+    blocks = iter_input_blocks(19)
+    workflows = map(Workflow, next(blocks))
     workflow_dict = {w.name: w for w in workflows}
-    parts = list(map(Part, input_parts[1]))
+    parts = list(map(Part, next(blocks)))
     return workflow_dict, parts
 
 
@@ -1,8 +1,7 @@
 from enum import Enum
 
-from util.data_util import convert_string_list
 from util.file_util import read_input_file
-from util.math_util import Area, NEWSDirections, Position
+from util.math_util import CompactArea, NEWSDirections, Position, create_compact_area
 from util.run_util import RunTimer
 
 
@@ -17,9 +16,9 @@ PARITY_0 = 0
 PARITY_1 = 1
 
 
-def parse_input_file() -> Area:
+def parse_input_file() -> CompactArea:
     lines = read_input_file(21)
-    return Area(convert_string_list(lines, Field))
+    return create_compact_area(lines, Field)
 
 
 def level21_finite(steps: int) -> int:
@@ -32,21 +31,16 @@ def level21_finite(steps: int) -> int:
         new_reached_fields = set()
         for position in reached_fields:
             for direction in NEWSDirections:
-                if area.safe_check(position + direction, Field.Free):
-                    new_reached_fields.add(position + direction)
+                neighbor = position + direction
+                if area.safe_check(neighbor, Field.Free):
+                    new_reached_fields.add(neighbor)
         reached_fields = new_reached_fields
 
     return len(reached_fields)
 
 
-def calc_reachable_fields(area: Area, start: Position, steps: int) -> list[int]:
-    reachable_fields: list[int] = [0, 0]
-    for position in area:
-        distance = (position - start).get_orthogonal_length()
-        if area[position] == Field.Reachable and distance <= steps:
-            parity = (position.x + position.y) % 2
-            reachable_fields[parity] += 1
-    return reachable_fields
+def calc_reachable_fields(area: CompactArea, start: Position, steps: int) -> list[int]:
+    return area.count_within_distance(Field.Reachable, start, steps)
 
 
 def level21_infinite(steps: int) -> int:
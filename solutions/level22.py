@@ -1,4 +1,6 @@
-from util.data_util import create_3d_list
+from collections.abc import Iterator
+
+from util.data_util import SparseVoxels
 from util.file_util import read_input_file
 from util.math_util import clamp
 from util.run_util import RunTimer
@@ -20,7 +22,19 @@ class Brick:
     def get_delta(self) -> tuple[int, int, int]:
         return clamp(self.end_x - self.start_x), clamp(self.end_y - self.start_y), clamp(self.end_z - self.start_z)
 
-    def __iter__(self) -> tuple[int, int, int]:
+    def get_bottom_z(self) -> int:
+        return min(self.start_z, self.end_z)
+
+    def get_footprint(self) -> Iterator[tuple[int, int]]:
+        for x in range(min(self.start_x, self.end_x), max(self.start_x, self.end_x) + 1):
+            for y in range(min(self.start_y, self.end_y), max(self.start_y, self.end_y) + 1):
+                yield x, y
+
+    def move_down(self, distance: int):
+        self.start_z -= distance
+        self.end_z -= distance
+
+    def __iter__(self) -> Iterator[tuple[int, int, int]]:
         position_x, position_y, position_z = self.start_x, self.start_y, self.start_z
         delta_x, delta_y, delta_z = self.get_delta()
 
@@ -35,94 +49,100 @@ class Brick:
 
 class Area:
     bricks: list[Brick]
-    field: list[list[list[bool]]]
+    voxels: SparseVoxels
+    supported_by: list[list[int]]
+    supporting: list[list[int]]
 
     def __init__(self, bricks: list[Brick]):
         self.bricks = bricks
-        self._init_field()
-
-    def _init_field(self):
-        max_x, max_y, max_z = self.bricks[0].start_x, self.bricks[0].start_y, self.bricks[0].start_z
-
-        for brick in self.bricks:
-            max_x = max(max_x, brick.start_x, brick.end_x)
-            max_y = max(max_y, brick.start_y, brick.end_y)
-            max_z = max(max_z, brick.start_z, brick.end_z)
-
-        self.field = create_3d_list(max_x + 1, max_y + 1, max_z + 1, False)
-
-        for x in range(max_x + 1):
-            for y in range(max_y + 1):
-                self.field[x][y][0] = True
-
-        for brick in self.bricks:
-            self.add_brick(brick)
+        self.voxels = SparseVoxels()
+        self.supported_by = []
+        self.supporting = []
 
     def let_bricks_fall(self):
-        unstable_bricks = []
-        for brick in self.bricks:
-            unstable_bricks.append(brick)
-        unstable_bricks.sort(key=lambda b: min(b.start_z, b.end_z))
-
-        while unstable_bricks:
-            i = 0
-            while i < len(unstable_bricks):
-                brick = unstable_bricks[i]
-                if self.can_brick_move(brick):
-                    self.move_brick(brick)
-                    i += 1
-                else:
-                    unstable_bricks.pop(i)
-
-        self.bricks.sort(key=lambda b: min(b.start_z, b.end_z))
-
-    def can_brick_move(self, brick: Brick) -> bool:
-        if brick.start_z == brick.end_z:
-            for position_x, position_y, position_z in brick:
-                if self.field[position_x][position_y][position_z - 1]:
-                    return False
-            return True
-        else:
-            z_check = min(brick.start_z, brick.end_z) - 1
-            return not self.field[brick.start_x][brick.start_y][z_check]
-
-    def move_brick(self, brick: Brick):
-        self.remove_brick(brick)
-
-        brick.start_z -= 1
-        brick.end_z -= 1
-
-        self.add_brick(brick)
-
-    def remove_brick(self, brick: Brick):
-        for position_x, position_y, position_z in brick:
-            self.field[position_x][position_y][position_z] = False
-
-    def add_brick(self, brick: Brick):
-        for position_x, position_y, position_z in brick:
-            self.field[position_x][position_y][position_z] = True
+        # lowest bricks first, each one drops right onto the highest occupied voxel below its footprint
+        self.bricks.sort(key=lambda b: b.get_bottom_z())
+        self.voxels = SparseVoxels()
+        self.supported_by = [[] for _ in self.bricks]
+        self.supporting = [[] for _ in self.bricks]
+        for brick_i, brick in enumerate(self.bricks):
+            footprint = list(brick.get_footprint())
+            bottom_z = brick.get_bottom_z()
+            below = [self.voxels.get_highest_below(x, y, bottom_z) for x, y in footprint]
+            rest_z = max((voxel[0] for voxel in below if voxel is not None), default=0) + 1
+            supporters = {voxel[1] for voxel in below if voxel is not None and voxel[0] == rest_z - 1}
+            for supporter_i in supporters:
+                self.supported_by[brick_i].append(supporter_i)
+                self.supporting[supporter_i].append(brick_i)
+
+            brick.move_down(bottom_z - rest_z)
+            self.voxels.add_segment((brick.start_x, brick.start_y, brick.start_z),
+                                    (brick.end_x, brick.end_y, brick.end_z), brick_i)
+
+    def count_falling_bricks(self, brick_i: int) -> int:
+        # a brick falls as soon as the last of its supporters fell
+        remaining_supporters = {}
+        num_falling = 0
+        to_check = [brick_i]
+        while to_check:
+            falling_i = to_check.pop()
+            for above_i in self.supporting[falling_i]:
+                remaining = remaining_supporters.get(above_i, len(self.supported_by[above_i])) - 1
+                remaining_supporters[above_i] = remaining
+                if remaining == 0:
+                    num_falling += 1
+                    to_check.append(above_i)
+        return num_falling
+
+    def calc_dominators(self) -> list[int]:
+        # immediate dominator of every brick, -1 is the ground. a brick falls without brick d exactly when
+        # d dominates it, so its dominator is the lowest common ancestor of all its supporters
+        num_levels = max(1, len(self.bricks).bit_length())
+        # node 0 is the ground, brick i is node i + 1
+        ancestors = [[0] * (len(self.bricks) + 1) for _ in range(num_levels)]
+        depths = [0] * (len(self.bricks) + 1)
+
+        def find_common_ancestor(node_a: int, node_b: int) -> int:
+            if depths[node_a] < depths[node_b]:
+                node_a, node_b = node_b, node_a
+            difference = depths[node_a] - depths[node_b]
+            level = 0
+            while difference:
+                if difference & 1:
+                    node_a = ancestors[level][node_a]
+                difference >>= 1
+                level += 1
+            if node_a == node_b:
+                return node_a
+            for level in reversed(range(num_levels)):
+                if ancestors[level][node_a] != ancestors[level][node_b]:
+                    node_a = ancestors[level][node_a]
+                    node_b = ancestors[level][node_b]
+            return ancestors[0][node_a]
+
+        # bricks are sorted by height, so all supporters of a brick are already in the tree
+        for brick_i, supporters in enumerate(self.supported_by):
+            node = brick_i + 1
+            dominator = 0
+            if supporters:
+                dominator = supporters[0] + 1
+                for supporter_i in supporters[1:]:
+                    dominator = find_common_ancestor(dominator, supporter_i + 1)
+            depths[node] = depths[dominator] + 1
+            ancestors[0][node] = dominator
+            for level in range(1, num_levels):
+                ancestors[level][node] = ancestors[level - 1][ancestors[level - 1][node]]
+        return [dominator - 1 for dominator in ancestors[0][1:]]
 
     def calc_disintegration(self) -> tuple[int, int]:
-        num_stable_bricks = 0
-        num_chain_reactions = 0
-        for brick_i in range(len(self.bricks)):
-            brick = self.bricks[brick_i]
-            removed_bricks: set[int] = {brick_i}
-            self.remove_brick(brick)
-
-            for other_brick_i in range(brick_i + 1, len(self.bricks), 1):
-                other_brick = self.bricks[other_brick_i]
-                if other_brick_i not in removed_bricks and self.can_brick_move(other_brick):
-                    removed_bricks.add(other_brick_i)
-                    self.remove_brick(other_brick)
-
-            if len(removed_bricks) == 1:
-                num_stable_bricks += 1
-            num_chain_reactions += len(removed_bricks) - 1
-
-            for removed_brick_i in removed_bricks:
-                self.add_brick(self.bricks[removed_brick_i])
-
+        # the bricks falling after removing one are the rest of its dominator subtree
+        subtree_sizes = [1] * len(self.bricks)
+        dominators = self.calc_dominators()
+        for brick_i in reversed(range(len(self.bricks))):
+            if dominators[brick_i] != -1:
+                subtree_sizes[dominators[brick_i]] += subtree_sizes[brick_i]
+        num_stable_bricks = subtree_sizes.count(1)
+        num_chain_reactions = sum(subtree_sizes) - len(subtree_sizes)
         return num_stable_bricks, num_chain_reactions
 
 
@@ -1,7 +1,9 @@
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
+from multiprocessing import Value
 
-from util.data_util import create_2d_list, convert_string_list
+from util.data_util import convert_string_list
 from util.file_util import read_input_file
 from util.math_util import Area, Position, NEWSDirections, Direction
 from util.run_util import RunTimer
@@ -30,8 +32,135 @@ class Field(Enum):
             return [Direction.East]
 
 
-NOT_WALKED = 9999999999999
 NOT_FOUND = -1
+SPLIT_DEPTH = 6
+SYNC_INTERVAL = 1024
+
+
+class TrailGraph:
+    # junctions are numbered from 0, so a set of visited junctions is a bitmask
+    edges: list[list[tuple[int, int]]]
+    start: int
+    end: int
+    neighbor_masks: list[int]
+    max_incoming: list[int]
+
+    def __init__(self, edges: list[list[tuple[int, int]]], start: int, end: int):
+        self.start = start
+        self.end = end
+        entries = [node for node, node_edges in enumerate(edges) if any(next_node == end for next_node, _ in node_edges)]
+        if len(entries) == 1:
+            # leaving the only junction before the end anywhere else cuts the end off
+            exit_node = entries[0]
+            edges = [*edges]
+            edges[exit_node] = [edge for edge in edges[exit_node] if edge[0] == end]
+        self.edges = edges
+        self.neighbor_masks = [0] * len(edges)
+        self.max_incoming = [0] * len(edges)
+        for node, node_edges in enumerate(edges):
+            for next_node, length in node_edges:
+                self.neighbor_masks[node] |= 1 << next_node
+                self.max_incoming[next_node] = max(self.max_incoming[next_node], length)
+
+    def get_reachable(self, node: int, mask: int) -> int:
+        # flood fill over the junctions not visited yet
+        neighbor_masks = self.neighbor_masks
+        reachable = 0
+        frontier = neighbor_masks[node] & ~mask
+        while frontier:
+            reachable |= frontier
+            next_frontier = 0
+            while frontier:
+                lowest = frontier & -frontier
+                frontier ^= lowest
+                next_frontier |= neighbor_masks[lowest.bit_length() - 1]
+            frontier = next_frontier & ~mask & ~reachable
+        return reachable
+
+    def get_upper_bound(self, reachable: int) -> int:
+        # every junction still to visit is entered by at most its longest incoming corridor
+        max_incoming = self.max_incoming
+        bound = 0
+        while reachable:
+            lowest = reachable & -reachable
+            reachable ^= lowest
+            bound += max_incoming[lowest.bit_length() - 1]
+        return bound
+
+    def find_longest_path(self) -> int:
+        return self.find_longest_path_from(self.start, 1 << self.start, 0)
+
+    def split_frontier(self, depth: int) -> list[tuple[int, int, int]]:
+        # all (junction, visited mask, score) prefixes of the search tree at the given depth, or earlier at the end
+        prefixes = [(self.start, 1 << self.start, 0)]
+        for _ in range(depth):
+            next_prefixes = []
+            for node, mask, score in prefixes:
+                if node == self.end:
+                    next_prefixes.append((node, mask, score))
+                    continue
+                for next_node, length in self.edges[node]:
+                    if not mask >> next_node & 1:
+                        next_prefixes.append((next_node, mask | 1 << next_node, score + length))
+            prefixes = next_prefixes
+        return prefixes
+
+    def find_longest_path_from(self, node: int, mask: int, score: int, best: int = NOT_FOUND, shared_best=None) -> int:
+        # depth first over (junction, visited mask, score), cutting branches that can't reach the end or beat the
+        # best path, and states that were already reached with the same junctions on a longer path
+        edges = self.edges
+        end_bit = 1 << self.end if self.end >= 0 else 0
+        best_scores: dict[tuple[int, int], int] = {}
+        stack = [(node, mask, score)]
+        num_steps = 0
+        while stack:
+            node, mask, score = stack.pop()
+            num_steps += 1
+            if shared_best is not None and num_steps % SYNC_INTERVAL == 0:
+                best = max(best, shared_best.value)
+            if node == self.end:
+                if score > best:
+                    best = score
+                    if shared_best is not None:
+                        with shared_best.get_lock():
+                            shared_best.value = max(shared_best.value, best)
+                continue
+            reachable = self.get_reachable(node, mask)
+            if not reachable & end_bit or score + self.get_upper_bound(reachable) <= best:
+                continue
+            if best_scores.get((node, mask), NOT_FOUND) >= score:
+                continue
+            best_scores[(node, mask)] = score
+            for next_node, length in edges[node]:
+                if not mask >> next_node & 1:
+                    stack.append((next_node, mask | 1 << next_node, score + length))
+        return best
+
+
+_worker_graph: TrailGraph | None = None
+_worker_best = None
+
+
+def _init_worker(graph: TrailGraph, shared_best):
+    global _worker_graph, _worker_best
+    _worker_graph = graph
+    _worker_best = shared_best
+
+
+def _find_longest_path_from(prefix: tuple[int, int, int]) -> int:
+    node, mask, score = prefix
+    return _worker_graph.find_longest_path_from(node, mask, score, _worker_best.value, _worker_best)
+
+
+def find_longest_path_parallel(graph: TrailGraph, num_workers: int, split_depth: int = SPLIT_DEPTH) -> int:
+    # the prefixes are searched independently and share the best score found so far for pruning, a search
+    # returns at least the shared score it read, so the maximum over all of them is the longest path
+    prefixes = graph.split_frontier(split_depth)
+    if not prefixes:
+        return NOT_FOUND
+    shared_best = Value("q", NOT_FOUND)
+    with ProcessPoolExecutor(num_workers, initializer=_init_worker, initargs=(graph, shared_best)) as executor:
+        return max(executor.map(_find_longest_path_from, prefixes))
 
 
 class Landscape(Area):
@@ -41,83 +170,66 @@ class Landscape(Area):
     def __init__(self, lines: list[str]):
         super().__init__(convert_string_list(lines, Field))
         self.start = Position(1, 0)
-        self.end = Position(len(self.field) - 2, len(self.field) - 1)
-
-    def find_longest_hike(self, can_climb: bool) -> int:
-        crossings = self.find_all_crossings(can_climb)
-        last_field = self.find_last_crossing(crossings)
-        return self.find_longest_path(crossings, 0, self.start, {self.start.hash_value}, last_field)
-
-    def find_last_crossing(self, crossings: dict[Position, list[tuple[Position, int]]]) -> Position:
-        for crossing, ends in crossings.items():
-            for end, _ in ends:
-                if end == self.end:
-                    return crossing
-
-    def find_all_crossings(self, can_climb: bool) -> dict[Position, list[tuple[Position, int]]]:
-        crossings: dict[Position, list[tuple[Position, int]]] = dict()
-        unchecked_crossings: deque[Position] = deque()
-        unchecked_crossings.append(Position(1, 0))
-
-        while unchecked_crossings:
-            crossing = unchecked_crossings.popleft()
-            next_crossings = self.find_next_crossings(crossing.x, crossing.y, can_climb)
-            crossings[crossing] = next_crossings
-            for next_crossing in next_crossings:
-                if next_crossing[0] not in crossings:
-                    unchecked_crossings.append(next_crossing[0])
-
-        return crossings
-
-    def find_next_crossings(self, x: int, y: int, can_climb: bool) -> list[tuple[Position, int]]:
-        crossings = []
-
-        paths = Area(create_2d_list(self.bounds.x, self.bounds.y, NOT_WALKED))
-        paths.field[y][x] = 0
-
-        paths_to_follow = deque()
-        paths_to_follow.extend(self._a_star_calc_next_steps(paths, 0, x, y, can_climb))
-
-        while paths_to_follow:
-            score, position = paths_to_follow.popleft()
-            if score < paths.field[position.y][position.x]:
-                paths.field[position.y][position.x] = score
-
-                if (position.x == self.end.x and position.y == self.end.y) or (position.x == self.start.x and position.y == self.start.y):
-                    crossings.append((position, score))
-                else:
-                    next_paths = self._a_star_calc_next_steps(paths, score, position.x, position.y, can_climb)
-                    if len(next_paths) > 1:
-                        crossings.append((position, score))
-                    else:
-                        paths_to_follow.extend(next_paths)
-        return crossings
-
-    def _a_star_calc_next_steps(self, paths: Area, score: int, x: int, y: int, can_climb: bool) -> set[tuple[int, Position]]:
-        next_steps = set()
-        check_directions = self.field[y][x].get_check_directions(can_climb)
-
-        for direction in check_directions:
-            new_score = score + 1
-            new_x = x + direction.x
-            new_y = y + direction.y
-            if 0 <= new_x < self.bounds.x and 0 <= new_y < self.bounds.y and self.field[new_y][new_x] != Field.Wall and score < paths.field[new_y][new_x]:
-                next_steps.add((new_score, Position(new_x, new_y)))
-        return next_steps
-
-    def find_longest_path(self, crossings: dict[Position, list[tuple[Position, int]]], score: int, crossing: Position, used_crossings: set[int], last_field: Position) -> int:
-        if crossing.x == last_field.x and crossing.y == last_field.y:
-            for next_crossing in crossings[last_field]:
-                if next_crossing[0] == self.end:
-                    return score + crossings[last_field][0][1]
-
-        max_score = NOT_FOUND
-        for next_crossing in crossings[crossing]:
-            if next_crossing[0].hash_value not in used_crossings:
-                new_score = self.find_longest_path(crossings, score + next_crossing[1], next_crossing[0], {*used_crossings, next_crossing[0].hash_value}, last_field)
-                max_score = max(max_score, new_score)
-
-        return max_score
+        self.end = Position(len(self.field[0]) - 2, len(self.field) - 1)
+
+    def find_longest_hike(self, can_climb: bool, num_workers: int = 1) -> int:
+        graph = self.build_graph(can_climb)
+        if num_workers == 1:
+            return graph.find_longest_path()
+        return find_longest_path_parallel(graph, num_workers)
+
+    def is_free(self, x: int, y: int) -> bool:
+        return 0 <= x < self.bounds.x and 0 <= y < self.bounds.y and self.field[y][x] != Field.Wall
+
+    def find_junctions(self) -> set[tuple[int, int]]:
+        junctions = {(self.start.x, self.start.y), (self.end.x, self.end.y)}
+        for y, line in enumerate(self.field):
+            for x, field in enumerate(line):
+                if field != Field.Wall and sum(self.is_free(x + d.x, y + d.y) for d in NEWSDirections) > 2:
+                    junctions.add((x, y))
+        return junctions
+
+    def build_graph(self, can_climb: bool) -> TrailGraph:
+        junctions = self.find_junctions()
+        start = (self.start.x, self.start.y)
+        node_ids = {start: 0}
+        edges: list[dict[int, int]] = [{}]
+        unchecked_junctions = deque([start])
+        while unchecked_junctions:
+            x, y = unchecked_junctions.popleft()
+            node_edges = edges[node_ids[(x, y)]]
+            for direction in self.field[y][x].get_check_directions(can_climb):
+                corridor = self.walk_corridor(x, y, direction, can_climb, junctions)
+                if corridor is None:
+                    continue
+                junction, length = corridor
+                if junction not in node_ids:
+                    node_ids[junction] = len(edges)
+                    edges.append({})
+                    unchecked_junctions.append(junction)
+                next_node = node_ids[junction]
+                node_edges[next_node] = max(node_edges.get(next_node, 0), length)
+        end = node_ids.get((self.end.x, self.end.y), NOT_FOUND)
+        return TrailGraph([list(node_edges.items()) for node_edges in edges], 0, end)
+
+    def walk_corridor(self, x: int, y: int, direction: Direction, can_climb: bool, junctions: set[tuple[int, int]]) -> tuple[tuple[int, int], int] | None:
+        # a corridor has a single way on until the next junction, None if it is a dead end or a slope points back
+        previous = (x, y)
+        x, y = x + direction.x, y + direction.y
+        length = 1
+        if not self.is_free(x, y):
+            return None
+        while (x, y) not in junctions:
+            for direction in self.field[y][x].get_check_directions(can_climb):
+                next_x, next_y = x + direction.x, y + direction.y
+                if (next_x, next_y) != previous and self.is_free(next_x, next_y):
+                    break
+            else:
+                return None
+            previous = (x, y)
+            x, y = next_x, next_y
+            length += 1
+        return (x, y), length
 
 
 def parse_input_file() -> Landscape:
@@ -125,9 +237,9 @@ def parse_input_file() -> Landscape:
     return Landscape(lines)
 
 
-def level23() -> tuple[int, int]:
+def level23(num_workers: int = 1) -> tuple[int, int]:
     landscape = parse_input_file()
-    return landscape.find_longest_hike(False), landscape.find_longest_hike(True)
+    return landscape.find_longest_hike(False), landscape.find_longest_hike(True, num_workers)
 
 
 if __name__ == '__main__':
@@ -138,3 +250,4 @@ if __name__ == '__main__':
 
 def test_level21():
     assert level23() == (94, 154)
+    assert level23(2) == (94, 154)
@@ -1,7 +1,12 @@
-import copy
+import bisect
 from typing import Tuple
 
-from util.file_util import read_input_file
+from util.file_util import iter_input_blocks
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class Range:
@@ -18,57 +23,109 @@ class Range:
         return self.source + self.length - 1
 
 
-class SeedRange:
-    start: int
-    length: int
-    is_planted: bool
-
-    def __init__(self, start: int, length: int, is_planted: bool):
-        self.start = start
-        self.length = length
-        self.is_planted = is_planted
-
-    def get_last(self):
-        return self.start + self.length - 1
+class PiecewiseMap:
+    # x in [starts[i], starts[i + 1]) maps to x + offsets[i], the first piece starts at 0 and the last one never ends
+    starts: list[int]
+    offsets: list[int]
+
+    def __init__(self, starts: list[int], offsets: list[int]):
+        self.starts = starts
+        self.offsets = offsets
+
+    @staticmethod
+    def from_ranges(ranges: list[Range]):
+        starts = [0]
+        offsets = [0]
+        for next_range in sorted(ranges, key=lambda r: r.source):
+            if next_range.source > starts[-1]:
+                starts.append(next_range.source)
+                offsets.append(next_range.destination - next_range.source)
+            else:
+                offsets[-1] = next_range.destination - next_range.source
+            starts.append(next_range.source + next_range.length)
+            offsets.append(0)
+        return PiecewiseMap(starts, offsets).merged()
+
+    @staticmethod
+    def identity():
+        return PiecewiseMap([0], [0])
+
+    def merged(self):
+        starts = [self.starts[0]]
+        offsets = [self.offsets[0]]
+        for start, offset in zip(self.starts[1:], self.offsets[1:]):
+            if offset != offsets[-1]:
+                starts.append(start)
+                offsets.append(offset)
+        return PiecewiseMap(starts, offsets)
+
+    def map_value(self, value: int) -> int:
+        return value + self.offsets[bisect.bisect_right(self.starts, value) - 1]
+
+    def map_values(self, values: list[int]) -> "list[int] | np.ndarray":
+        # an int64 array with numpy, so callers can stay vectorized, a plain list without it
+        if np is None:
+            return list(map(self.map_value, values))
+        # one searchsorted for all values, the pieces cover every number so no mask is needed
+        values = np.asarray(values, dtype=np.int64)
+        pieces = np.searchsorted(np.array(self.starts, dtype=np.int64), values, side="right") - 1
+        return values + np.array(self.offsets, dtype=np.int64)[pieces]
+
+    def then(self, other):
+        # one map doing self first and other afterwards, each piece is cut where its image hits a start of other
+        starts = []
+        offsets = []
+        ends = self.starts[1:] + [None]
+        for start, end, offset in zip(self.starts, ends, self.offsets):
+            i = bisect.bisect_right(other.starts, start + offset) - 1
+            starts.append(start)
+            offsets.append(offset + other.offsets[i])
+            i += 1
+            while i < len(other.starts) and (end is None or other.starts[i] < end + offset):
+                starts.append(other.starts[i] - offset)
+                offsets.append(offset + other.offsets[i])
+                i += 1
+        return PiecewiseMap(starts, offsets).merged()
+
+    def get_min_in_range(self, start: int, length: int) -> int:
+        # every piece is increasing, so only the first value of each overlapped piece can be the minimum
+        end = start + length
+        i = bisect.bisect_right(self.starts, start) - 1
+        min_value = start + self.offsets[i]
+        i += 1
+        while i < len(self.starts) and self.starts[i] < end:
+            min_value = min(min_value, self.starts[i] + self.offsets[i])
+            i += 1
+        return min_value
 
 
 def level5() -> Tuple[int, int]:
     seeds, range_maps = parse_input_file()
-    results = copy.deepcopy(seeds)
-    for range_map in range_maps:
-        results = transform_seeds_with_ranges(results, range_map)
-    min_location_part1 = min(results)
+    seed_to_location = compose_maps(range_maps)
+    locations = seed_to_location.map_values(seeds)
+    min_location_part1 = int(locations.min()) if np is not None else min(locations)
+    min_location_part2 = min(seed_to_location.get_min_in_range(seeds[i], seeds[i + 1])
+                             for i in range(0, len(seeds) - 1, 2))
+    return min_location_part1, min_location_part2
 
-    seed_ranges = construct_seed_ranges(seeds)
-    max_number = seed_ranges[-1].start + seed_ranges[-1].length
-    range_maps = fill_ranges(range_maps, max_number)
 
-    result_ranges = copy.deepcopy(seed_ranges)
+def compose_maps(range_maps: list[list[Range]]) -> PiecewiseMap:
+    composed = PiecewiseMap.identity()
     for range_map in range_maps:
-        result_ranges = transform_ranges_with_ranges(result_ranges, range_map)
-
-    min_location_part2 = 0
-    for result_range in result_ranges:
-        if result_range.is_planted:
-            min_location_part2 = result_range.start
-            break
-
-    return min_location_part1, min_location_part2
+        composed = composed.then(PiecewiseMap.from_ranges(range_map))
+    return composed
 
 
 def parse_input_file() -> Tuple[list[int], list[list[Range]]]:
-    lines = read_input_file(5)
-    seeds = list(map(int, lines[0].split(" ")[1:]))
+    blocks = iter_input_blocks(5)
+    seeds = list(map(int, next(blocks)[0].split(" ")[1:]))
     range_maps = list()
-    current_map = list()
-    for line in lines[3:]:
-        if line == "":
-            range_maps.append(sort_range_map(current_map))
-            current_map = list()
-        elif line[0].isdigit():
+    for block in blocks:
+        current_map = list()
+        for line in block[1:]:
             parts = line.split(" ")
             current_map.append(Range(int(parts[0]), int(parts[1]), int(parts[2])))
-    range_maps.append(sort_range_map(current_map))
+        range_maps.append(sort_range_map(current_map))
     return seeds, range_maps
 
 
@@ -76,80 +133,6 @@ def sort_range_map(source: list[Range]) -> list[Range]:
     return sorted(source, key=lambda r: r.source, reverse=False)
 
 
-def transform_seeds_with_ranges(source_list: list[int], ranges: list[Range]):
-    results = list()
-    for source_number in source_list:
-        found = False
-        for test_range in ranges:
-            if test_range.source <= source_number < test_range.source + test_range.length:
-                results.append(test_range.destination + source_number - test_range.source)
-                found = True
-                break
-        if not found:
-            results.append(source_number)
-    return results
-
-
-def fill_ranges(range_maps: list[list[Range]], max_number: int) -> list[list[Range]]:
-    for range_map in range_maps:
-        range_additions = list()
-        new_range_start = 0
-        for next_range in range_map:
-            if next_range.source > new_range_start:
-                range_additions.append(Range(new_range_start, new_range_start, next_range.source - new_range_start))
-            new_range_start = next_range.source + next_range.length
-        if new_range_start < max_number:
-            range_additions.append(Range(new_range_start, new_range_start, max_number - new_range_start))
-        range_map.extend(range_additions)
-    range_maps = list(map(lambda r: sorted(r, key=lambda sort_range: sort_range.source), range_maps))
-    return range_maps
-
-
-def construct_seed_ranges(seeds: list[int]) -> list[SeedRange]:
-    seed_ranges = list()
-    for i in range(0, int(len(seeds) / 2)):
-        seed_ranges.append(SeedRange(seeds[i * 2], seeds[i * 2 + 1], True))
-    seed_ranges.sort(key=lambda r: r.start)
-    max_number = seed_ranges[-1].start + seed_ranges[-1].length
-    seed_range_additions = list()
-    new_seed_range_start = 0
-    for next_seed_range in seed_ranges:
-        if next_seed_range.start > new_seed_range_start:
-            seed_range_additions.append(
-                SeedRange(new_seed_range_start, next_seed_range.start - new_seed_range_start, False))
-        new_seed_range_start = next_seed_range.start + next_seed_range.length
-    if new_seed_range_start < max_number:
-        seed_range_additions.append(SeedRange(new_seed_range_start, max_number - new_seed_range_start, False))
-    seed_ranges.extend(seed_range_additions)
-    seed_ranges.sort(key=lambda r: r.start)
-    return seed_ranges
-
-
-def transform_ranges_with_ranges(source_ranges: list[SeedRange], transform_ranges: list[Range]):
-    results = list()
-    for source_range in source_ranges:
-        transform_start = source_range.start
-        transform_end = source_range.get_last()
-        for transform_range in transform_ranges:
-            if transform_range.source <= transform_start <= transform_range.get_last():
-                if transform_end <= transform_range.get_last():
-                    # fully covered
-                    new_start = transform_range.destination + transform_start - transform_range.source
-                    results.append(SeedRange(new_start,
-                                             transform_end - transform_start + 1,
-                                             source_range.is_planted))
-                    break
-                else:
-                    # partly covered
-                    new_start = transform_range.destination + transform_start - transform_range.source
-                    results.append(SeedRange(new_start,
-                                             transform_range.get_last() - transform_start + 1,
-                                             source_range.is_planted))
-                    transform_start = transform_range.get_last() + 1
-
-    return sorted(results, key=lambda r: r.start)
-
-
 if __name__ == '__main__':
     print("Lowest location: " + str(level5()))
 
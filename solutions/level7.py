@@ -1,5 +1,6 @@
 from enum import Enum
 
+from util.cache_util import cached_parse
 from util.file_util import read_input_file
 
 
@@ -95,6 +96,7 @@ def level7(joker: bool) -> int:
     return total_winnings
 
 
+@cached_parse(7)
 def parse_input_file(joker: bool) -> list[Bid]:
     lines = read_input_file(7)
     return list(map(lambda line: Bid(line, joker), lines))
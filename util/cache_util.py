@@ -0,0 +1,153 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from collections import OrderedDict
+from collections.abc import Callable
+
+from util.file_util import get_input_file_path
+from util.run_util import count
+
+FILE_ID_PARAMETERS = ("file_id", "file")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ParseCache:
+    # the memory part is limited by the number of entries and by their pickled size, the disk part isn't
+    max_entries: int
+    max_bytes: int
+    directory: str | None
+    entries: OrderedDict[str, bytes]
+    num_bytes: int
+    digests: dict[tuple[str, int, int], str]
+
+    def __init__(self, max_entries: int = 64, directory: str | None = None, max_bytes: int = 256 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.num_bytes = 0
+        self.digests = {}
+
+    def clear(self):
+        self.entries.clear()
+        self.num_bytes = 0
+        self.digests.clear()
+
+    def get_file_digest(self, path: str) -> str:
+        # hashing is skipped as long as size and modification time stay the same
+        stat = os.stat(path)
+        stat_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self.digests.get(stat_key)
+        if digest is None:
+            file_hash = hashlib.sha256()
+            with open(path, "rb") as input_file:
+                for chunk in iter(lambda: input_file.read(1 << 20), b""):
+                    file_hash.update(chunk)
+            digest = file_hash.hexdigest()
+            self.digests[stat_key] = digest
+        return digest
+
+    def get(self, key: str) -> bytes | None:
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+            return data
+
+        if self.directory is not None:
+            path = self._get_disk_path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as cache_file:
+                    data = cache_file.read()
+                self._store_in_memory(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        self._store_in_memory(key, data)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._get_disk_path(key)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as cache_file:
+                cache_file.write(data)
+            os.replace(temp_path, path)
+
+    def _store_in_memory(self, key: str, data: bytes):
+        old_data = self.entries.pop(key, None)
+        if old_data is not None:
+            self.num_bytes -= len(old_data)
+        if len(data) > self.max_bytes:
+            # wouldn't fit even alone, it is only kept on disk
+            return
+        self.entries[key] = data
+        self.num_bytes += len(data)
+        while len(self.entries) > self.max_entries or self.num_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.num_bytes -= len(evicted)
+
+    def _get_disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha256(key.encode()).hexdigest()}.pickle")
+
+
+PARSE_CACHE = ParseCache()
+
+
+def configure_parse_cache(max_entries: int | None = None, directory: str | None = None, max_bytes: int | None = None):
+    if max_entries is not None:
+        PARSE_CACHE.max_entries = max_entries
+    if max_bytes is not None:
+        PARSE_CACHE.max_bytes = max_bytes
+    PARSE_CACHE.directory = directory
+
+
+def get_code_digest(module_name: str) -> str:
+    # the parser's module and every project module it uses, so a changed parser or parsed class misses the cache
+    module = sys.modules[module_name]
+    module_names = {module_name}
+    for value in vars(module).values():
+        used_module = value if inspect.ismodule(value) else inspect.getmodule(value)
+        if used_module is not None:
+            module_names.add(used_module.__name__)
+
+    code_hash = hashlib.sha256()
+    for name in sorted(module_names):
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path is not None and os.path.abspath(path).startswith(PROJECT_ROOT + os.sep):
+            with open(path, "rb") as source_file:
+                code_hash.update(name.encode())
+                code_hash.update(source_file.read())
+    return code_hash.hexdigest()
+
+
+def cached_parse(level_id: int) -> Callable:
+    # results are stored pickled, so every call gets its own copy that it may change freely
+    def decorator(parser: Callable) -> Callable:
+        signature = inspect.signature(parser)
+        parser_id = f"{parser.__module__}.{parser.__qualname__}"
+        get_parser_code_digest = functools.cache(lambda: get_code_digest(parser.__module__))
+
+        @functools.wraps(parser)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            file_id = next((arguments.arguments[name] for name in FILE_ID_PARAMETERS if name in arguments.arguments), 0)
+            digest = PARSE_CACHE.get_file_digest(get_input_file_path(level_id, file_id))
+            key = f"{parser_id}@{get_parser_code_digest()}{arguments.args!r}{arguments.kwargs!r}:{digest}"
+
+            data = PARSE_CACHE.get(key)
+            if data is not None:
+                count("parse cache hits")
+                return pickle.loads(data)
+
+            count("parse cache misses")
+            result = parser(*args, **kwargs)
+            try:
+                PARSE_CACHE.put(key, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+            except (pickle.PicklingError, AttributeError, TypeError):
+                # results that can't be pickled are simply parsed again next time
+                pass
+            return result
+        return wrapper
+    return decorator
@@ -1,3 +1,4 @@
+import bisect
 from enum import Enum
 from typing import TypeVar
 
@@ -38,3 +39,79 @@ def split_input_when_empty(lines: list[str]) -> list[list[str]]:
     except ValueError:
         split_list.append(lines[last_split:])
         return split_list
+
+
+class SparseVoxels:
+    # per (x, y) column a sorted list of disjoint z intervals, so memory follows the occupied voxels only
+    columns: dict[tuple[int, int], tuple[list[int], list[int], list]]
+
+    def __init__(self):
+        self.columns = {}
+
+    def add(self, x: int, y: int, start_z: int, end_z: int, value=True):
+        starts, ends, values = self.columns.setdefault((x, y), ([], [], []))
+        i = bisect.bisect_left(starts, start_z)
+        if (i > 0 and ends[i - 1] >= start_z) or (i < len(starts) and starts[i] <= end_z):
+            raise ValueError(f"{x},{y},{start_z}-{end_z} overlaps occupied voxels")
+        starts.insert(i, start_z)
+        ends.insert(i, end_z)
+        values.insert(i, value)
+
+    def remove(self, x: int, y: int, start_z: int, end_z: int):
+        # cuts the z range out of the column, intervals sticking out of it keep their remaining voxels
+        column = self.columns.get((x, y))
+        if column is None:
+            return
+        starts, ends, values = column
+        i = max(0, bisect.bisect_right(starts, start_z) - 1)
+        kept = []
+        while i < len(starts) and starts[i] <= end_z:
+            if ends[i] >= start_z:
+                if starts[i] < start_z:
+                    kept.append((starts[i], start_z - 1, values[i]))
+                if ends[i] > end_z:
+                    kept.append((end_z + 1, ends[i], values[i]))
+                del starts[i], ends[i], values[i]
+            else:
+                i += 1
+        for kept_start, kept_end, kept_value in kept:
+            self.add(x, y, kept_start, kept_end, kept_value)
+        if not starts:
+            del self.columns[(x, y)]
+
+    def add_segment(self, start: tuple[int, int, int], end: tuple[int, int, int], value=True):
+        for x, y, start_z, end_z in self._get_columns(start, end):
+            self.add(x, y, start_z, end_z, value)
+
+    def remove_segment(self, start: tuple[int, int, int], end: tuple[int, int, int]):
+        for x, y, start_z, end_z in self._get_columns(start, end):
+            self.remove(x, y, start_z, end_z)
+
+    @staticmethod
+    def _get_columns(start: tuple[int, int, int], end: tuple[int, int, int]):
+        start_z, end_z = min(start[2], end[2]), max(start[2], end[2])
+        for x in range(min(start[0], end[0]), max(start[0], end[0]) + 1):
+            for y in range(min(start[1], end[1]), max(start[1], end[1]) + 1):
+                yield x, y, start_z, end_z
+
+    def get(self, x: int, y: int, z: int):
+        column = self.columns.get((x, y))
+        if column is not None:
+            starts, ends, values = column
+            i = bisect.bisect_right(starts, z) - 1
+            if i >= 0 and ends[i] >= z:
+                return values[i]
+        return None
+
+    def get_highest_below(self, x: int, y: int, z: int) -> tuple[int, object] | None:
+        # highest occupied voxel under z in the column and its value
+        column = self.columns.get((x, y))
+        if column is not None:
+            starts, ends, values = column
+            i = bisect.bisect_left(starts, z) - 1
+            if i >= 0:
+                return min(ends[i], z - 1), values[i]
+        return None
+
+    def __len__(self) -> int:
+        return sum(sum(ends) - sum(starts) + len(starts) for starts, ends, _ in self.columns.values())
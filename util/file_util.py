@@ -1,9 +1,35 @@
+import mmap
+import os
 import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import List
 
+INPUT_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "input-files")
 
-def read_input_file(level_id: int, file_id: int = 0, strip: bool = True) -> List[str]:
-    if "pytest" in sys.modules:
+_input_folder_override: str | None = None
+_input_file_overrides: dict[int, str] = {}
+
+
+def set_input_folder(folder: str | None):
+    global _input_folder_override
+    _input_folder_override = folder
+
+
+def set_input_file(level_id: int, path: str | None):
+    if path is None:
+        _input_file_overrides.pop(level_id, None)
+    else:
+        _input_file_overrides[level_id] = path
+
+
+def get_input_file_path(level_id: int, file_id: int = 0) -> str:
+    if level_id in _input_file_overrides:
+        return _input_file_overrides[level_id]
+
+    if _input_folder_override is not None:
+        folder = _input_folder_override
+    elif "pytest" in sys.modules:
         folder = "test"
     else:
         folder = "prod"
@@ -13,8 +39,45 @@ def read_input_file(level_id: int, file_id: int = 0, strip: bool = True) -> List
     else:
         file = f"-{file_id}"
 
-    input_file = open(f"../input-files/{folder}/level{level_id}{file}.txt", "r")
-    lines = input_file.readlines()
-    if strip:
-        lines = [line.strip() for line in lines]
-    return lines
+    return os.path.join(INPUT_FOLDER, folder, f"level{level_id}{file}.txt")
+
+
+def read_input_file(level_id: int, file_id: int = 0, strip: bool = True) -> List[str]:
+    with open(get_input_file_path(level_id, file_id), "r") as input_file:
+        if strip:
+            return [line.strip() for line in input_file]
+        return input_file.readlines()
+
+
+def iter_input_file(level_id: int, file_id: int = 0, strip: bool = True) -> Iterator[str]:
+    with open(get_input_file_path(level_id, file_id), "r") as input_file:
+        for line in input_file:
+            yield line.strip() if strip else line
+
+
+def iter_input_blocks(level_id: int, file_id: int = 0) -> Iterator[list[str]]:
+    # blocks are separated by empty lines, only one block is kept in memory
+    block = []
+    for line in iter_input_file(level_id, file_id):
+        if line == "":
+            yield block
+            block = []
+        else:
+            block.append(line)
+    if block:
+        yield block
+
+
+@contextmanager
+def map_input_file(level_id: int, file_id: int = 0) -> Iterator[memoryview]:
+    with open(get_input_file_path(level_id, file_id), "rb") as input_file:
+        if input_file.seek(0, 2) == 0:
+            # mmap can't map empty files
+            yield memoryview(b"")
+            return
+        with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            view = memoryview(mapped_file)
+            try:
+                yield view
+            finally:
+                view.release()
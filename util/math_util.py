@@ -3,6 +3,11 @@ from enum import Enum
 
 from util.data_util import create_2d_list
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def count_digits(n) -> int:
     if n == 0:
@@ -185,27 +190,56 @@ def is_turn_left(old: Direction, new: Direction) -> bool:
 
 
 class Position:
+    # instances are never changed after creation, so they can be shared and interned
+    __slots__ = ("x", "y", "hash_value")
+
     x: int
     y: int
     hash_value: int
 
     def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-        self.calc_hash()
+        # __setattr__ refuses every change, so the slots are written through their descriptors
+        _set_x(self, x)
+        _set_y(self, y)
+        # runtime optimization: inlined encode_coordinates
+        zig_x = x << 1 if x >= 0 else ~(x << 1)
+        zig_y = y << 1 if y >= 0 else ~(y << 1)
+        _set_hash_value(self, zig_x * zig_x + zig_x + zig_y if zig_x >= zig_y else zig_y * zig_y + zig_x)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"Position is immutable, can't set {name}")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"Position is immutable, can't delete {name}")
+
+    def __reduce__(self):
+        # pickle and copy would restore the slots through __setattr__
+        return Position, (self.x, self.y)
+
+    @staticmethod
+    def interned(x: int, y: int):
+        if 0 <= x < INTERN_LIMIT and 0 <= y < INTERN_LIMIT:
+            key = y * INTERN_LIMIT + x
+            position = _interned_positions.get(key)
+            if position is None:
+                position = Position(x, y)
+                _interned_positions[key] = position
+            return position
+        return Position(x, y)
 
     def __eq__(self, other) -> bool:
-        if isinstance(other, Position):
+        if other.__class__ is Position:
             return self.x == other.x and self.y == other.y
         return False
 
     def __ne__(self, other) -> bool:
-        if isinstance(other, Position):
+        if other.__class__ is Position:
             return self.x != other.x or self.y != other.y
         return True
 
     def __add__(self, other):
-        if isinstance(other, Position) or isinstance(other, Direction):
+        # runtime optimization: exact class checks for the common cases first
+        if other.__class__ is Direction or other.__class__ is Position:
             return Position(self.x + other.x, self.y + other.y)
         if isinstance(other, int):
             return Position(self.x + other, self.y + other)
@@ -213,23 +247,8 @@ class Position:
             return Position(self.x + other[0], self.y + other[1])
         raise TypeError(f"{other} is no Position, Direction, int, or tuple[int, int]")
 
-    def __iadd__(self, other):
-        if isinstance(other, Position) or isinstance(other, Direction):
-            self.x += other.x
-            self.y += other.y
-        elif isinstance(other, int):
-            self.x += other
-            self.y += other
-        elif isinstance(other, tuple) and isinstance(other[0], int) and isinstance(other[1], int):
-            self.x += other[0]
-            self.y += other[1]
-        else:
-            raise TypeError(f"{other} is no Position, Direction, int, or tuple[int, int]")
-        self.calc_hash()
-        return self
-
     def __sub__(self, other):
-        if isinstance(other, Position) or isinstance(other, Direction):
+        if other.__class__ is Direction or other.__class__ is Position:
             return Position(self.x - other.x, self.y - other.y)
         if isinstance(other, int):
             return Position(self.x - other, self.y - other)
@@ -237,23 +256,8 @@ class Position:
             return Position(self.x - other[0], self.y - other[1])
         raise TypeError(f"{other} is no Position, Direction, int, or tuple[int, int]")
 
-    def __isub__(self, other):
-        if isinstance(other, Position) or isinstance(other, Direction):
-            self.x -= other.x
-            self.y -= other.y
-        elif isinstance(other, int):
-            self.x -= other
-            self.y -= other
-        elif isinstance(other, tuple) and isinstance(other[0], int) and isinstance(other[1], int):
-            self.x -= other[0]
-            self.y -= other[1]
-        else:
-            raise TypeError(f"{other} is no Position, Direction, int, or tuple[int, int]")
-        self.calc_hash()
-        return self
-
     def __mul__(self, other):
-        if isinstance(other, Position) or isinstance(other, Direction):
+        if other.__class__ is Direction or other.__class__ is Position:
             return Position(self.x * other.x, self.y * other.y)
         if isinstance(other, int):
             return Position(self.x * other, self.y * other)
@@ -261,23 +265,8 @@ class Position:
             return Position(self.x * other[0], self.y * other[1])
         raise TypeError(f"{other} is no Position, Direction, int, or tuple[int, int]")
 
-    def __imul__(self, other):
-        if isinstance(other, Position) or isinstance(other, Direction):
-            self.x *= other.x
-            self.y *= other.y
-        elif isinstance(other, int):
-            self.x *= other
-            self.y *= other
-        elif isinstance(other, tuple) and isinstance(other[0], int) and isinstance(other[1], int):
-            self.x *= other[0]
-            self.y *= other[1]
-        else:
-            raise TypeError(f"{other} is no Position, int, or tuple[int, int]")
-        self.calc_hash()
-        return self
-
     def __floordiv__(self, other):
-        if isinstance(other, Position):
+        if other.__class__ is Position:
             return Position(self.x // other.x, self.y // other.y)
         if isinstance(other, int):
             return Position(self.x // other, self.y // other)
@@ -285,30 +274,12 @@ class Position:
             return Position(self.x // other[0], self.y // other[1])
         raise TypeError(f"{other} is no Position, int, or tuple[int, int]")
 
-    def __ifloordiv__(self, other):
-        if isinstance(other, Position):
-            self.x //= other.x
-            self.y //= other.y
-        elif isinstance(other, int):
-            self.x //= other
-            self.y //= other
-        elif isinstance(other, tuple) and isinstance(other[0], int) and isinstance(other[1], int):
-            self.x //= other[0]
-            self.y //= other[1]
-        else:
-            raise TypeError(f"{other} is no Position, int, or tuple[int, int]")
-        self.calc_hash()
-        return self
-
     def __neg__(self):
         return Position(-self.x, -self.y)
 
     def __hash__(self):
         return self.hash_value
 
-    def calc_hash(self):
-        self.hash_value = self.y * 10000000 + self.x
-
     def is_in_bounds(self, bounds) -> bool:
         if isinstance(bounds, Position):
             return 0 <= self.x < bounds.x and 0 <= self.y < bounds.y
@@ -319,6 +290,9 @@ class Position:
     def __str__(self):
         return f"Position({self.x}, {self.y})"
 
+    def __repr__(self):
+        return str(self)
+
     def __getitem__(self, index: int) -> int:
         if index == 0:
             return self.x
@@ -327,15 +301,6 @@ class Position:
         else:
             raise IndexError(f"Invalid index {index}")
 
-    def __setitem__(self, index: int, value: int):
-        if index == 0:
-            self.x = value
-        elif index == 1:
-            self.y = value
-        else:
-            raise IndexError(f"Invalid index {index}")
-        self.calc_hash()
-
     def __mod__(self, other):
         if isinstance(other, Position):
             return Position(self.x % other.x, self.y % other.y)
@@ -361,8 +326,75 @@ class Position:
         return Position(self.x, self.y)
 
 
-def position_and_direction_hash(position: Position, direction: Direction) -> int:
-    return position.__hash__() * 10 + direction.__hash__()
+_set_x = Position.x.__set__
+_set_y = Position.y.__set__
+_set_hash_value = Position.hash_value.__set__
+
+INTERN_LIMIT = 1024
+_interned_positions: dict[int, Position] = {}
+
+
+def zigzag(n: int) -> int:
+    # maps 0, -1, 1, -2, 2, ... to 0, 1, 2, 3, 4, ...
+    return n << 1 if n >= 0 else ~(n << 1)
+
+
+def pair(a: int, b: int) -> int:
+    # Szudzik pairing: unique for every pair of non-negative ints, without any upper bound
+    return a * a + a + b if a >= b else b * b + a
+
+
+def encode_coordinates(x: int, y: int) -> int:
+    return pair(zigzag(x), zigzag(y))
+
+
+class StateKeyEncoder:
+    # packs values of the given ranges into one int, a value is stored as its index in its range
+    starts: tuple[int, ...]
+    steps: tuple[int, ...]
+    sizes: tuple[int, ...]
+    size: int
+
+    def __init__(self, *value_ranges: range):
+        self.starts = tuple(value_range.start for value_range in value_ranges)
+        self.steps = tuple(value_range.step for value_range in value_ranges)
+        self.sizes = tuple(len(value_range) for value_range in value_ranges)
+        self.size = math.prod(self.sizes)
+
+    def _check_arity(self, num_values: int):
+        if num_values != len(self.sizes):
+            raise ValueError(f"Expected {len(self.sizes)} values, got {num_values}")
+
+    def encode(self, *values: int) -> int:
+        self._check_arity(len(values))
+        key = 0
+        for value, start, step, size in zip(values, self.starts, self.steps, self.sizes):
+            index, remainder = divmod(value - start, step)
+            if remainder or not 0 <= index < size:
+                raise ValueError(f"{value} is not in range({start}, {start + step * size}, {step})")
+            key = key * size + index
+        return key
+
+    def decode(self, key: int) -> tuple[int, ...]:
+        values = []
+        for start, step, size in zip(reversed(self.starts), reversed(self.steps), reversed(self.sizes)):
+            key, index = divmod(key, size)
+            values.append(start + index * step)
+        return tuple(reversed(values))
+
+    def encode_batch(self, *columns):
+        self._check_arity(len(columns))
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Columns differ in length")
+        if np is not None and self.size <= 2 ** 63:
+            keys = np.zeros(len(columns[0]), dtype=np.int64)
+            for column, start, step, size in zip(columns, self.starts, self.steps, self.sizes):
+                indices, remainders = np.divmod(np.asarray(column, dtype=np.int64) - start, step)
+                if indices.size and (remainders.any() or indices.min() < 0 or indices.max() >= size):
+                    raise ValueError(f"Values out of range({start}, {start + step * size}, {step})")
+                keys = keys * size + indices
+            return keys
+        return [self.encode(*values) for values in zip(*columns)]
 
 
 class Area:
@@ -418,14 +450,10 @@ class Area:
         while fields_to_fill:
             position = fields_to_fill.pop()
             self[position] = value
-            if self.safe_check(position + Direction.North, old_value):
-                fields_to_fill.add(position + Direction.North)
-            if self.safe_check(position + Direction.East, old_value):
-                fields_to_fill.add(position + Direction.East)
-            if self.safe_check(position + Direction.South, old_value):
-                fields_to_fill.add(position + Direction.South)
-            if self.safe_check(position + Direction.West, old_value):
-                fields_to_fill.add(position + Direction.West)
+            for direction in NEWSDirections:
+                neighbor = position + direction
+                if self.safe_check(neighbor, old_value):
+                    fields_to_fill.add(neighbor)
 
     def get_value_set(self) -> set:
         result = set()
@@ -438,3 +466,262 @@ class Area:
             if self[position] == value:
                 return position
         raise ValueError(f"Couldn't find {value} in area!")
+
+
+class CompactArea(Area):
+    cells: bytearray
+    symbols: list
+    codes: dict
+    width: int
+
+    def __init__(self, field: list):
+        if isinstance(field[0], str):
+            field = list(map(lambda line: list(line), field))
+        self.bounds = Position(len(field[0]), len(field))
+        self.width = self.bounds.x
+        self.symbols = []
+        self.codes = {}
+        self.cells = bytearray(self.bounds.x * self.bounds.y)
+        for y, line in enumerate(field):
+            if len(line) != self.width:
+                raise ValueError(f"Line {y} has length {len(line)}, expected {self.width}")
+            self.cells[y * self.width:(y + 1) * self.width] = bytes(map(self._get_code, line))
+        self._init_cells()
+
+    @classmethod
+    def from_lines(cls, lines, value_type=None):
+        # translates whole lines at once without creating per-cell objects, so every cell is one latin-1 char
+        # and the values of value_type have to be single chars as well
+        area = cls.__new__(cls)
+        area.symbols = []
+        area.codes = {}
+        table = bytearray([255]) * 256
+        if value_type is not None:
+            for value in value_type:
+                if not isinstance(value.value, str) or len(value.value) != 1 or ord(value.value) > 255:
+                    raise ValueError(f"{value} is no single latin-1 char, can't be used in a compact area")
+                table[ord(value.value)] = area._get_code(value)
+
+        cells = bytearray()
+        width = None
+        height = 0
+        for line in lines:
+            if width is None:
+                width = len(line)
+            elif len(line) != width:
+                raise ValueError(f"Line {height} has length {len(line)}, expected {width}")
+            if value_type is None:
+                for char in set(line).difference(area.codes):
+                    table[ord(char)] = area._get_code(char)
+            cells += line.encode("latin-1").translate(table)
+            height += 1
+
+        if not width:
+            raise ValueError("Area needs at least one non-empty line")
+        if 255 in cells:
+            raise ValueError(f"Invalid value in area, expected {value_type}")
+
+        area.cells = cells
+        area.width = width
+        area.bounds = Position(area.width, height)
+        area._init_cells()
+        return area
+
+    @classmethod
+    def from_bounds_and_value(cls, bounds: Position, value):
+        area = cls.__new__(cls)
+        area.symbols = []
+        area.codes = {}
+        area.bounds = bounds.copy()
+        area.width = bounds.x
+        area.cells = bytearray([area._get_code(value)]) * (bounds.x * bounds.y)
+        area._init_cells()
+        return area
+
+    def _init_cells(self):
+        pass
+
+    def _get_code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.symbols)
+            if code >= 255:
+                raise ValueError(f"Too many different values in area, can't add {value}")
+            self.symbols.append(value)
+            self.codes[value] = code
+        return code
+
+    def __getitem__(self, position: Position):
+        return self.symbols[self.cells[position.y * self.width + position.x]]
+
+    def __setitem__(self, position: Position, value):
+        self.cells[position.y * self.width + position.x] = self._get_code(value)
+
+    def safe_check(self, position: Position, value):
+        return self.fast_safe_check(position.x, position.y, value)
+
+    def fast_safe_check(self, x: int, y: int, value):
+        code = self.codes.get(value)
+        return (code is not None and 0 <= x < self.bounds.x and 0 <= y < self.bounds.y
+                and self.cells[y * self.width + x] == code)
+
+    def __iter__(self):
+        for y in range(self.bounds.y):
+            for x in range(self.bounds.x):
+                yield Position(x, y)
+
+    def __str__(self):
+        if self.symbols and isinstance(self.symbols[0], Enum):
+            symbols = list(map(lambda x: x.value, self.symbols))
+        else:
+            symbols = list(map(str, self.symbols))
+        return "\n".join(
+            "".join(symbols[code] for code in self.cells[y * self.width:(y + 1) * self.width])
+            for y in range(self.bounds.y))
+
+    def count(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            return 0
+        return self.cells.count(code)
+
+    def flood_fill(self, start: Position, value):
+        old_code = self.cells[start.y * self.width + start.x]
+        new_code = self._get_code(value)
+        if old_code == new_code:
+            return
+
+        cells = self.cells
+        width = self.width
+        size = len(cells)
+        start_i = start.y * width + start.x
+        cells[start_i] = new_code
+        fields_to_fill = [start_i]
+        while fields_to_fill:
+            i = fields_to_fill.pop()
+            x = i % width
+            if i >= width and cells[i - width] == old_code:
+                cells[i - width] = new_code
+                fields_to_fill.append(i - width)
+            if x < width - 1 and cells[i + 1] == old_code:
+                cells[i + 1] = new_code
+                fields_to_fill.append(i + 1)
+            if i + width < size and cells[i + width] == old_code:
+                cells[i + width] = new_code
+                fields_to_fill.append(i + width)
+            if x > 0 and cells[i - 1] == old_code:
+                cells[i - 1] = new_code
+                fields_to_fill.append(i - 1)
+
+    def get_value_set(self) -> set:
+        return {symbol for code, symbol in enumerate(self.symbols) if code in self.cells}
+
+    def find_first(self, value) -> Position:
+        code = self.codes.get(value)
+        i = -1 if code is None else self.cells.find(code)
+        if i == -1:
+            raise ValueError(f"Couldn't find {value} in area!")
+        return Position(i % self.width, i // self.width)
+
+    def count_within_distance(self, value, center: Position, max_distance: int) -> list[int]:
+        # counts by parity of x + y, one slice per row of the diamond around center
+        code = self.codes.get(value)
+        counts = [0, 0]
+        if code is None:
+            return counts
+
+        for y in range(max(0, center.y - max_distance), min(self.bounds.y, center.y + max_distance + 1)):
+            remaining = max_distance - abs(y - center.y)
+            start_x = max(0, center.x - remaining)
+            end_x = min(self.bounds.x, center.x + remaining + 1)
+            if start_x >= end_x:
+                continue
+            row_start = y * self.width
+            for parity in range(2):
+                first_x = start_x + (start_x + y + parity) % 2
+                counts[parity] += self.cells[row_start + first_x:row_start + end_x:2].count(code)
+        return counts
+
+
+class NumpyArea(CompactArea):
+    grid: "np.ndarray"
+
+    def _init_cells(self):
+        if np is None:
+            raise ImportError("NumpyArea requires numpy")
+        # writable view on the same buffer, so CompactArea methods stay valid
+        self.grid = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.bounds.y, self.bounds.x)
+
+    def count(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            return 0
+        return int(np.count_nonzero(self.grid == code))
+
+    def get_value_set(self) -> set:
+        return {self.symbols[code] for code in np.unique(self.grid)}
+
+    def find_first(self, value) -> Position:
+        code = self.codes.get(value)
+        if code is not None:
+            mask = self.grid.ravel() == code
+            i = int(np.argmax(mask))
+            if mask[i]:
+                return Position(i % self.width, i // self.width)
+        raise ValueError(f"Couldn't find {value} in area!")
+
+    def get_mask(self, value) -> "np.ndarray":
+        code = self.codes.get(value)
+        if code is None:
+            return np.zeros(self.grid.shape, dtype=bool)
+        return self.grid == code
+
+    def flood_fill(self, start: Position, value):
+        # the runs of fillable cells in every row are the nodes, runs touching the next row are connected,
+        # so only the run graph is walked in python instead of every cell
+        old_code = self.grid[start.y, start.x]
+        new_code = self._get_code(value)
+        if old_code == new_code:
+            return
+
+        fillable = self.grid == old_code
+        run_starts = fillable.copy()
+        run_starts[:, 1:] &= ~fillable[:, :-1]
+        run_ids = np.cumsum(run_starts.ravel()).reshape(fillable.shape) - 1
+        num_runs = int(run_ids[-1, -1]) + 1
+
+        # one link per overlap of two runs, found in row order, so the links are already sorted by either run
+        touching = fillable[:-1] & fillable[1:]
+        overlap_starts = touching.copy()
+        overlap_starts[:, 1:] &= ~touching[:, :-1] | run_starts[:-1, 1:] | run_starts[1:, 1:]
+        upper = run_ids[:-1][overlap_starts]
+        lower = run_ids[1:][overlap_starts]
+        run_range = np.arange(num_runs + 1)
+        links = ((np.searchsorted(upper, run_range).tolist(), lower.tolist()),
+                 (np.searchsorted(lower, run_range).tolist(), upper.tolist()))
+
+        start_run = int(run_ids[start.y, start.x])
+        reached = bytearray(num_runs)
+        reached[start_run] = 1
+        runs_to_fill = [start_run]
+        while runs_to_fill:
+            run = runs_to_fill.pop()
+            for offsets, neighbors in links:
+                for neighbor in neighbors[offsets[run]:offsets[run + 1]]:
+                    if not reached[neighbor]:
+                        reached[neighbor] = 1
+                        runs_to_fill.append(neighbor)
+        filled = np.frombuffer(reached, dtype=bool)[run_ids] & fillable
+        self.grid[filled] = new_code
+
+    def count_within_distance(self, value, center: Position, max_distance: int) -> list[int]:
+        ys, xs = np.ogrid[0:self.bounds.y, 0:self.bounds.x]
+        in_reach = self.get_mask(value) & (np.abs(ys - center.y) + np.abs(xs - center.x) <= max_distance)
+        odd = ((ys + xs) % 2).astype(bool)
+        return [int(np.count_nonzero(in_reach & ~odd)), int(np.count_nonzero(in_reach & odd))]
+
+
+def create_compact_area(lines, value_type=None) -> CompactArea:
+    if np is not None:
+        return NumpyArea.from_lines(lines, value_type)
+    return CompactArea.from_lines(lines, value_type)
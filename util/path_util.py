@@ -0,0 +1,250 @@
+import sys
+from collections.abc import Callable, Iterable, Iterator
+
+from util.math_util import Direction, Position, StateKeyEncoder
+from util.run_util import count
+
+# quarter turns clockwise, a turn of 1 from North is East
+HEADINGS = (Direction.North, Direction.East, Direction.South, Direction.West)
+STRAIGHT = 0
+RIGHT = 1
+BACK = 2
+LEFT = 3
+
+
+class MovementRule:
+    # every move goes min_straight to max_straight fields in a line, then turns by one of the allowed turns,
+    # the state doesn't know the length of the last run, so going on straight could chain runs past max_straight
+    min_straight: int
+    max_straight: int
+    turns: tuple[int, ...]
+
+    def __init__(self, min_straight: int, max_straight: int, turns: Iterable[int] = (LEFT, RIGHT)):
+        if not 1 <= min_straight <= max_straight:
+            raise ValueError(f"Invalid straight run {min_straight}-{max_straight}")
+        self.min_straight = min_straight
+        self.max_straight = max_straight
+        self.turns = tuple(sorted({turn % 4 for turn in turns}))
+        if STRAIGHT in self.turns:
+            raise ValueError("A move already runs straight up to max_straight, STRAIGHT can't be a turn")
+
+    def get_num_headings(self) -> int:
+        # when opposite headings can turn into the same directions, only the axis has to be part of the state
+        if {(turn + BACK) % 4 for turn in self.turns} == set(self.turns):
+            return 2
+        return 4
+
+
+class PathResult:
+    cost: int
+    target: Position
+    waypoints: list[Position]
+
+    def __init__(self, cost: int, target: Position, waypoints: list[Position]):
+        self.cost = cost
+        self.target = target
+        self.waypoints = waypoints
+
+
+class GridPathFinder:
+    # the cost of a field is paid when entering it, fields are flat in x, y order
+    width: int
+    height: int
+    costs: list[int]
+    column_sums: list[int]
+    row_sums: list[int]
+
+    def __init__(self, width: int, height: int, cost: Callable[[int, int], int]):
+        self.width = width
+        self.height = height
+        self.costs = [cost(x, y) for x in range(width) for y in range(height)]
+        if min(self.costs) < 0:
+            raise ValueError("Costs must not be negative")
+
+        # prefix sums make the cost of a straight run O(1), column x starts at x * (height + 1)
+        self.column_sums = []
+        for x in range(width):
+            total = 0
+            self.column_sums.append(total)
+            for y in range(height):
+                total += self.costs[x * height + y]
+                self.column_sums.append(total)
+        self.row_sums = []
+        for y in range(height):
+            total = 0
+            self.row_sums.append(total)
+            for x in range(width):
+                total += self.costs[x * height + y]
+                self.row_sums.append(total)
+
+    @staticmethod
+    def from_area(field: list[list[int]]):
+        return GridPathFinder(len(field[0]), len(field), lambda x, y: field[y][x])
+
+    def get_field(self, position: Position) -> int:
+        if not (0 <= position.x < self.width and 0 <= position.y < self.height):
+            raise ValueError(f"{position} is outside of {self.width}x{self.height}")
+        return position.x * self.height + position.y
+
+    def get_estimates(self, targets: list[int], heuristic: str | None) -> list[int]:
+        if heuristic is None:
+            return [0] * len(self.costs)
+        if heuristic == "manhattan":
+            min_cost = min(self.costs)
+            target_positions = [divmod(target, self.height) for target in targets]
+            return [min_cost * min(abs(target_x - x) + abs(target_y - y) for target_x, target_y in target_positions)
+                    for x in range(self.width) for y in range(self.height)]
+        if heuristic == "relaxed":
+            return self.get_relaxed_estimates(targets)
+        raise ValueError(f"Unknown heuristic {heuristic}")
+
+    def get_relaxed_estimates(self, targets: list[int]) -> list[int]:
+        # cheapest way to any target when moving freely, tighter than manhattan but still admissible
+        width, height = self.width, self.height
+        costs = self.costs
+        unreached = sum(costs) + 1
+        distances = [unreached] * len(costs)
+        num_buckets = max(costs) + 1
+        buckets: list[list[int]] = [[] for _ in range(num_buckets)]
+        for target in targets:
+            distances[target] = 0
+            buckets[0].append(target)
+        num_queued = len(targets)
+        distance = 0
+        while num_queued:
+            bucket = buckets[distance % num_buckets]
+            while bucket:
+                field = bucket.pop()
+                num_queued -= 1
+                if distances[field] != distance:
+                    continue
+                # the neighbours pay for entering this field
+                next_distance = distance + costs[field]
+                x, y = divmod(field, height)
+                for neighbour, is_inside in ((field - 1, y > 0), (field + 1, y < height - 1),
+                                             (field - height, x > 0), (field + height, x < width - 1)):
+                    if is_inside and next_distance < distances[neighbour]:
+                        distances[neighbour] = next_distance
+                        buckets[next_distance % num_buckets].append(neighbour)
+                        num_queued += 1
+            distance += 1
+        return distances
+
+    def find_shortest_path(self, starts: Iterable[Position], targets: Iterable[Position], rule: MovementRule,
+                           heuristic: str | None = "relaxed") -> PathResult:
+        for result in self._search(starts, targets, rule, heuristic, False):
+            return result
+        raise ValueError("Couldn't find a target")
+
+    def find_shortest_paths(self, starts: Iterable[Position], targets: Iterable[Position],
+                            rule: MovementRule) -> dict[Position, PathResult]:
+        # a heuristic towards all targets would favour the closest one, so this is plain dijkstra
+        return {result.target: result for result in self._search(starts, targets, rule, None, True)}
+
+    def _search(self, starts: Iterable[Position], targets: Iterable[Position], rule: MovementRule,
+                heuristic: str | None, find_all: bool) -> Iterator[PathResult]:
+        # dial's algorithm: costs are small integers, so a list of buckets replaces the priority queue
+        width, height = self.width, self.height
+        num_headings = rule.get_num_headings()
+        state_keys = StateKeyEncoder(range(width), range(height), range(num_headings))
+        target_fields = [self.get_field(target) for target in targets]
+        is_target = bytearray(len(self.costs))
+        for target in target_fields:
+            is_target[target] = 1
+        num_targets = sum(is_target)
+        estimates = self.get_estimates(target_fields, heuristic)
+        min_straight, max_straight = rule.min_straight, rule.max_straight
+
+        # the runs going left or up read the prefix sums backwards, negated they can be added like the others
+        backward_row_sums = [-total for total in reversed(self.row_sums)]
+        backward_column_sums = [-total for total in reversed(self.column_sums)]
+        sums_by_heading = (backward_column_sums, self.row_sums, self.column_sums, backward_row_sums)
+
+        # per heading: (direction, heading after the move, key step, prefix sums) of every move it can start
+        moves = []
+        for heading in range(num_headings):
+            next_directions = sorted({(heading + turn) % 4 for turn in rule.turns})
+            moves.append([(direction, direction % num_headings,
+                           (HEADINGS[direction].x * height + HEADINGS[direction].y) * num_headings,
+                           sums_by_heading[direction]) for direction in next_directions])
+
+        best = [sys.maxsize] * state_keys.size
+        previous = [-1] * state_keys.size
+        # starts may be far apart, so the buckets grow with the priority instead of being a ring
+        buckets: list[list[int]] = []
+        num_queued = 0
+        for start in starts:
+            field = self.get_field(start)
+            while len(buckets) <= estimates[field]:
+                buckets.append([])
+            for heading in range(num_headings):
+                key = field * num_headings + heading
+                best[key] = 0
+                buckets[estimates[field]].append(key)
+                num_queued += 1
+
+        last_row_sum, last_column_sum = len(self.row_sums) - 1, len(self.column_sums) - 1
+        key_estimates = [estimate for estimate in estimates for _ in range(num_headings)]
+
+        num_buckets = len(buckets)
+        num_expanded = 0
+        priority = 0
+        while num_queued:
+            bucket = buckets[priority]
+            while bucket:
+                key = bucket.pop()
+                num_queued -= 1
+                score = best[key]
+                # a state is only queued again with a lower score, so stale entries have a different priority
+                if score + key_estimates[key] != priority:
+                    continue
+                num_expanded += 1
+                field, heading = divmod(key, num_headings)
+                if is_target[field]:
+                    is_target[field] = 0
+                    num_targets -= 1
+                    if num_targets == 0 or not find_all:
+                        # counted before the last result, a caller that got what it needs never resumes the search
+                        count("states expanded", num_expanded)
+                        yield self._create_result(key, score, previous, state_keys)
+                        return
+                    yield self._create_result(key, score, previous, state_keys)
+
+                x, y = divmod(field, height)
+                for direction, next_heading, key_step, sums in moves[heading]:
+                    if direction == 1:
+                        anchor, limit = y * (width + 1) + x + 1, width - 1 - x
+                    elif direction == 3:
+                        anchor, limit = last_row_sum - y * (width + 1) - x, x
+                    elif direction == 2:
+                        anchor, limit = x * (height + 1) + y + 1, height - 1 - y
+                    else:
+                        anchor, limit = last_column_sum - x * (height + 1) - y, y
+                    if limit > max_straight:
+                        limit = max_straight
+                    base_score = score - sums[anchor]
+                    next_key = key - heading + next_heading + key_step * (min_straight - 1)
+                    for distance in range(min_straight, limit + 1):
+                        next_key += key_step
+                        next_score = base_score + sums[anchor + distance]
+                        if next_score < best[next_key]:
+                            best[next_key] = next_score
+                            previous[next_key] = key
+                            next_priority = next_score + key_estimates[next_key]
+                            if next_priority >= num_buckets:
+                                buckets.extend([] for _ in range(next_priority + 1 - num_buckets))
+                                num_buckets = next_priority + 1
+                            buckets[next_priority].append(next_key)
+                            num_queued += 1
+            priority += 1
+        count("states expanded", num_expanded)
+
+    @staticmethod
+    def _create_result(key: int, score: int, previous: list[int], state_keys: StateKeyEncoder) -> PathResult:
+        waypoints = []
+        while key != -1:
+            x, y, _ = state_keys.decode(key)
+            waypoints.append(Position(x, y))
+            key = previous[key]
+        waypoints.reverse()
+        return PathResult(score, waypoints[-1], waypoints)
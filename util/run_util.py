@@ -1,14 +1,198 @@
+import functools
 import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import contextmanager
 
 
 class RunTimer:
-    start: float
+    start: int
 
     def __init__(self):
-        self.start = time.time()
+        self.start = time.perf_counter_ns()
 
     def get_time(self) -> float:
-        return time.time() - self.start
+        return (time.perf_counter_ns() - self.start) / 1e9
 
     def print(self):
-        print(f"Runtime: {self.get_time()}")
\ No newline at end of file
+        print(f"Runtime: {self.get_time()}")
+
+
+class Span:
+    name: str
+    calls: int
+    total_ns: int
+    peak_memory: int
+    counters: dict[str, int]
+    children: dict[str, "Span"]
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.peak_memory = 0
+        self.counters = {}
+        self.children = {}
+
+    def get_child(self, name: str) -> "Span":
+        child = self.children.get(name)
+        if child is None:
+            child = Span(name)
+            self.children[name] = child
+        return child
+
+    def get_self_ns(self) -> int:
+        return self.total_ns - sum(child.total_ns for child in self.children.values())
+
+
+class _Frame:
+    span: Span
+    start_ns: int
+    start_memory: int
+    peak_seen: int
+
+    def __init__(self, span: Span, start_memory: int):
+        self.span = span
+        self.start_memory = start_memory
+        self.peak_seen = 0
+        self.start_ns = time.perf_counter_ns()
+
+
+class Profiler:
+    root: Span
+    stack: list[_Frame]
+    trace_memory: bool
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.reset()
+
+    def reset(self):
+        self.root = Span("root")
+        self.stack = [_Frame(self.root, 0)]
+
+    def start_memory_tracing(self):
+        self.trace_memory = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop_memory_tracing(self):
+        self.trace_memory = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _enter(self, name: str) -> _Frame:
+        parent = self.stack[-1]
+        start_memory = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # the peak is reset for the child, so the parent remembers what it saw so far
+            parent.peak_seen = max(parent.peak_seen, peak)
+            tracemalloc.reset_peak()
+            start_memory = current
+        frame = _Frame(parent.span.get_child(name), start_memory)
+        self.stack.append(frame)
+        return frame
+
+    def _exit(self, frame: _Frame):
+        elapsed = time.perf_counter_ns() - frame.start_ns
+        self.stack.pop()
+        frame.span.calls += 1
+        frame.span.total_ns += elapsed
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = max(frame.peak_seen, tracemalloc.get_traced_memory()[1])
+            frame.span.peak_memory = max(frame.span.peak_memory, peak - frame.start_memory)
+            self.stack[-1].peak_seen = max(self.stack[-1].peak_seen, peak)
+
+    @contextmanager
+    def span(self, name: str):
+        frame = self._enter(name)
+        try:
+            yield frame.span
+        finally:
+            self._exit(frame)
+
+    def timed(self, name: str | None = None) -> Callable:
+        def decorator(function: Callable) -> Callable:
+            span_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                frame = self._enter(span_name)
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self._exit(frame)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, amount: int = 1):
+        counters = self.stack[-1].span.counters
+        counters[name] = counters.get(name, 0) + amount
+
+    def get_collapsed_stacks(self) -> list[str]:
+        # flame graph format: "frame;frame;frame <self time in microseconds>"
+        lines = []
+
+        def collect(span: Span, path: str):
+            self_us = span.get_self_ns() // 1000
+            if self_us > 0:
+                lines.append(f"{path} {self_us}")
+            for child in span.children.values():
+                collect(child, f"{path};{child.name}")
+
+        for child in self.root.children.values():
+            collect(child, child.name)
+        return lines
+
+    def write_collapsed_stacks(self, path: str):
+        with open(path, "w") as output_file:
+            output_file.write("\n".join(self.get_collapsed_stacks()) + "\n")
+
+    def print(self):
+        def print_span(span: Span, depth: int):
+            memory = f", peak {span.peak_memory / 1024 / 1024:.2f} MiB" if span.peak_memory else ""
+            counters = "".join(f", {name}: {value}" for name, value in span.counters.items())
+            print(f"{'  ' * depth}{span.name}: {span.total_ns / 1e9:.4f}s, {span.calls} calls{memory}{counters}")
+            for child in span.children.values():
+                print_span(child, depth + 1)
+
+        for child in self.root.children.values():
+            print_span(child, 0)
+
+
+PROFILER = Profiler()
+
+
+def span(name: str):
+    return PROFILER.span(name)
+
+
+def timed(name: str | None = None) -> Callable:
+    return PROFILER.timed(name)
+
+
+def count(name: str, amount: int = 1):
+    PROFILER.count(name, amount)
+
+
+def instrument(target, *names: str, profiler: Profiler = PROFILER) -> Callable[[], None]:
+    # wraps e.g. "parse_input_file" or "City.a_star" of a module in spans, returns a function to undo it
+    originals = []
+    for name in names:
+        *owner_path, attribute = name.split(".")
+        owner = target
+        for part in owner_path:
+            owner = getattr(owner, part)
+        original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+        if isinstance(original, staticmethod):
+            wrapped = staticmethod(profiler.timed(name)(original.__func__))
+        else:
+            wrapped = profiler.timed(name)(original)
+        setattr(owner, attribute, wrapped)
+        originals.append((owner, attribute, original))
+
+    def restore():
+        for restore_owner, restore_attribute, restore_original in reversed(originals):
+            setattr(restore_owner, restore_attribute, restore_original)
+    return restore